@@ -1,360 +1,1175 @@
+import multiprocessing
 import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 import chess_core as core
+from finali import TabelleFinali
+from libro import LibroAperture
+from transposition import TabellaTrasposizione, TabellaPedoni, ESATTO, INFERIORE, SUPERIORE
+from valutazione import VALORI_PEZZI, VALORI_CASELLA
 
 # ============================================================
 # VALUTAZIONE POSIZIONALE
 # ============================================================
 
-# Valori materiali standard
-VALORI_PEZZI = {
-    "P": 100, "N": 320, "B": 330, "R": 500, "Q": 900, "K": 20000
-}
-
-# Tabelle posizionali per pedoni (bonus per posizioni avanzate/centrali)
-TABELLA_PEDONI_W = [
-    [0,  0,  0,  0,  0,  0,  0,  0],
-    [50, 50, 50, 50, 50, 50, 50, 50],
-    [10, 10, 20, 30, 30, 20, 10, 10],
-    [5,  5, 10, 25, 25, 10,  5,  5],
-    [0,  0,  0, 20, 20,  0,  0,  0],
-    [5, -5,-10,  0,  0,-10, -5,  5],
-    [5, 10, 10,-20,-20, 10, 10,  5],
-    [0,  0,  0,  0,  0,  0,  0,  0]
-]
-
-TABELLA_PEDONI_B = [list(reversed(riga)) for riga in reversed(TABELLA_PEDONI_W)]
-
-# Tabelle posizionali per cavalli (bonus per centro)
-TABELLA_CAVALLI = [
-    [-50,-40,-30,-30,-30,-30,-40,-50],
-    [-40,-20,  0,  0,  0,  0,-20,-40],
-    [-30,  0, 10, 15, 15, 10,  0,-30],
-    [-30,  5, 15, 20, 20, 15,  5,-30],
-    [-30,  0, 15, 20, 20, 15,  0,-30],
-    [-30,  5, 10, 15, 15, 10,  5,-30],
-    [-40,-20,  0,  5,  5,  0,-20,-40],
-    [-50,-40,-30,-30,-30,-30,-40,-50]
-]
-
-# Tabelle per alfieri (diagonali lunghe)
-TABELLA_ALFIERI = [
-    [-20,-10,-10,-10,-10,-10,-10,-20],
-    [-10,  0,  0,  0,  0,  0,  0,-10],
-    [-10,  0,  5, 10, 10,  5,  0,-10],
-    [-10,  5,  5, 10, 10,  5,  5,-10],
-    [-10,  0, 10, 10, 10, 10,  0,-10],
-    [-10, 10, 10, 10, 10, 10, 10,-10],
-    [-10,  5,  0,  0,  0,  0,  5,-10],
-    [-20,-10,-10,-10,-10,-10,-10,-20]
-]
-
-# Tabelle per torri (colonne aperte)
-TABELLA_TORRI = [
-    [0,  0,  0,  0,  0,  0,  0,  0],
-    [5, 10, 10, 10, 10, 10, 10,  5],
-    [-5,  0,  0,  0,  0,  0,  0, -5],
-    [-5,  0,  0,  0,  0,  0,  0, -5],
-    [-5,  0,  0,  0,  0,  0,  0, -5],
-    [-5,  0,  0,  0,  0,  0,  0, -5],
-    [-5,  0,  0,  0,  0,  0,  0, -5],
-    [0,  0,  0,  5,  5,  0,  0,  0]
-]
-
-# Tabelle per regina (centro e mobilità)
-TABELLA_REGINA = [
-    [-20,-10,-10, -5, -5,-10,-10,-20],
-    [-10,  0,  0,  0,  0,  0,  0,-10],
-    [-10,  0,  5,  5,  5,  5,  0,-10],
-    [-5,  0,  5,  5,  5,  5,  0, -5],
-    [0,  0,  5,  5,  5,  5,  0, -5],
-    [-10,  5,  5,  5,  5,  5,  0,-10],
-    [-10,  0,  5,  0,  0,  0,  0,-10],
-    [-20,-10,-10, -5, -5,-10,-10,-20]
-]
-
-# Tabelle per re (early game: castello, late game: centro)
-TABELLA_RE_EARLY = [
-    [-30,-40,-40,-50,-50,-40,-40,-30],
-    [-30,-40,-40,-50,-50,-40,-40,-30],
-    [-30,-40,-40,-50,-50,-40,-40,-30],
-    [-30,-40,-40,-50,-50,-40,-40,-30],
-    [-20,-30,-30,-40,-40,-30,-30,-20],
-    [-10,-20,-20,-20,-20,-20,-20,-10],
-    [20, 20,  0,  0,  0,  0, 20, 20],
-    [20, 30, 10,  0,  0, 10, 30, 20]
-]
-
-TABELLE_POSIZIONALI = {
-    "P": (TABELLA_PEDONI_W, TABELLA_PEDONI_B),
-    "N": (TABELLA_CAVALLI, TABELLA_CAVALLI),
-    "B": (TABELLA_ALFIERI, TABELLA_ALFIERI),
-    "R": (TABELLA_TORRI, TABELLA_TORRI),
-    "Q": (TABELLA_REGINA, TABELLA_REGINA),
-    "K": (TABELLA_RE_EARLY, TABELLA_RE_EARLY)
-}
+# Materiale e tabelle posizionali (VALORI_CASELLA) stanno in valutazione.py
+
+# Struttura pedonale
+PENALITA_DOPPIATO = 15          # per ogni pedone in più sulla stessa colonna
+PENALITA_ISOLATO = 12           # per pedone senza pedoni amici sulle colonne vicine
+# Pedone passato: bonus per traversa raggiunta (indice 1 = seconda, 6 = settima)
+BONUS_PASSATO = (0, 5, 10, 20, 35, 60, 100, 0)
+
+# Cache dei punteggi dei pedoni, per chiave dei soli pedoni (una per processo)
+_pedoni = TabellaPedoni()
+
+
+def valuta_pedoni(board):
+    """
+    Struttura pedonale dal punto di vista del bianco: pedoni doppiati,
+    isolati e passati (solo il più avanzato di ogni colonna). Dipende
+    solo dai pedoni: nella ricerca passa dalla cache (struttura_pedoni).
+    """
+    # Per colonna: numero di pedoni e traverse estreme (8/-1 se nessuno)
+    n_b, n_n = [0] * 8, [0] * 8
+    min_b, max_b = [8] * 8, [-1] * 8
+    min_n, max_n = [8] * 8, [-1] * 8
+    for r in range(1, 7):
+        riga = board[r]
+        if "wP" in riga:
+            for c in range(8):
+                if riga[c] == "wP":
+                    n_b[c] += 1
+                    if r < min_b[c]: min_b[c] = r
+                    max_b[c] = r
+        if "bP" in riga:
+            for c in range(8):
+                if riga[c] == "bP":
+                    n_n[c] += 1
+                    if r < min_n[c]: min_n[c] = r
+                    max_n[c] = r
+    punteggio = 0
+    for c in range(8):
+        sx, dx = max(0, c - 1), min(7, c + 1)
+        if n_b[c]:
+            punteggio -= PENALITA_DOPPIATO * (n_b[c] - 1)
+            if not ((c > 0 and n_b[c - 1]) or (c < 7 and n_b[c + 1])):
+                punteggio -= PENALITA_ISOLATO * n_b[c]
+            # Passato: nessun pedone nero più avanti, su questa colonna o le vicine
+            r = min_b[c]
+            if min_n[sx] >= r and min_n[c] >= r and min_n[dx] >= r:
+                punteggio += BONUS_PASSATO[7 - r]
+        if n_n[c]:
+            punteggio += PENALITA_DOPPIATO * (n_n[c] - 1)
+            if not ((c > 0 and n_n[c - 1]) or (c < 7 and n_n[c + 1])):
+                punteggio += PENALITA_ISOLATO * n_n[c]
+            r = max_n[c]
+            if max_b[sx] <= r and max_b[c] <= r and max_b[dx] <= r:
+                punteggio -= BONUS_PASSATO[r]
+    return punteggio
+
+
+def struttura_pedoni(pos):
+    """valuta_pedoni dalla cache per pos.hash_pedoni (calcolata solo se manca)."""
+    valore = _pedoni.sonda(pos.hash_pedoni)
+    if valore is None:
+        valore = valuta_pedoni(pos.board)
+        _pedoni.salva(pos.hash_pedoni, valore)
+    return valore
 
 
 def valuta_posizione(board, colore_massimizza):
     """
     Valuta la posizione dalla prospettiva di colore_massimizza.
     Positivo = vantaggio per colore_massimizza, Negativo = svantaggio.
+    Scansione completa della board: nella ricerca si usa valuta(pos).
     """
-    punteggio = 0
-    
+    punteggio = valuta_pedoni(board)
     for r in range(8):
+        riga = board[r]
         for c in range(8):
-            pezzo = board[r][c]
-            if not pezzo:
-                continue
-            
-            colore_pezzo = pezzo[0]
-            tipo_pezzo = pezzo[1]
-            
-            # Valore materiale base
-            valore = VALORI_PEZZI[tipo_pezzo]
-            
-            # Valore posizionale
-            if tipo_pezzo in TABELLE_POSIZIONALI:
-                tabella_w, tabella_b = TABELLE_POSIZIONALI[tipo_pezzo]
-                if colore_pezzo == "w":
-                    valore += tabella_w[r][c]
-                else:
-                    valore += tabella_b[r][c]
-            
-            # Aggiungi o sottrai dal punteggio
-            if colore_pezzo == colore_massimizza:
-                punteggio += valore
-            else:
-                punteggio -= valore
-    
-    return punteggio
+            pezzo = riga[c]
+            if pezzo:
+                punteggio += VALORI_CASELLA[pezzo][r*8 + c]
+    return punteggio if colore_massimizza == "w" else -punteggio
+
+
+def valuta(pos):
+    """
+    Valutazione dal punto di vista di chi muove, uguale a valuta_posizione:
+    materiale e tabelle da pos.valutazione (mantenuta da chess_core a ogni
+    make/unmake), struttura pedonale dalla cache dei pedoni.
+    """
+    valore = pos.valutazione + struttura_pedoni(pos)
+    return valore if pos.turno == "w" else -valore
 
 
 # ============================================================
-# GENERAZIONE MOSSE
+# GENERAZIONE E ORDINAMENTO MOSSE
 # ============================================================
 
-def _tutte_mosse_pezzo(board, r0, c0):
+def _tutte_mosse_pezzo(pos, r0, c0):
     """Restituisce tutte le caselle di arrivo valide per il pezzo su (r0,c0)."""
-    mosse = []
-    for r1 in range(8):
-        for c1 in range(8):
-            if core.mossa_valida(board, (r0, c0), (r1, c1)):
-                mosse.append((r1, c1))
-    return mosse
+    return core.mosse_legali_pezzo(pos, (r0, c0))
 
 
-def lista_mosse_valide(board, colore="b"):
-    """Raccoglie tutte le mosse (partenza, arrivo) per il colore indicato."""
-    elenco = []
-    for r in range(8):
-        for c in range(8):
-            pezzo = board[r][c]
-            if pezzo and pezzo[0] == colore:
-                for arrivo in _tutte_mosse_pezzo(board, r, c):
-                    elenco.append(((r, c), arrivo))
-    return elenco
+def lista_mosse_valide(pos, colore="b"):
+    """Raccoglie tutte le mosse legali (interi codificati) per il colore indicato."""
+    return core.genera_mosse_legali(pos, colore)
+
+
+# Punteggi interi precalcolati: ogni mossa viene ordinata come
+# (punteggio << 16) | mossa, una lista di interi senza funzioni chiave.
+# MVV-LVA: Most Valuable Victim - Least Valuable Attacker (sempre > 0)
+_MVV_LVA = {v: {a: VALORI_PEZZI[v] * 10 - VALORI_PEZZI[a] + VALORI_PEZZI["K"]
+                for a in VALORI_PEZZI}
+            for v in "PNBRQ"}
+# Bonus per le mosse verso il centro, per casella di arrivo
+_CENTRO = [int((7 - abs(3.5 - (sq >> 3)) - abs(3.5 - (sq & 7))) * 2) for sq in range(64)]
+
+# Fasce di priorità (dalla più alta)
+_P_TT = 1 << 30                 # mossa della tabella delle trasposizioni
+_P_CATTURA = 1 << 28            # catture e promozioni a donna, + MVV-LVA
+_P_KILLER = 1 << 26             # killer 1, killer 2, contromossa
+_LIMITE_STORIA = 1 << 24        # oltre si dimezza tutta la storia
+
+MAX_PLY = 128
+_INDICE_PEZZO = {c + t: i for i, (c, t) in enumerate((c, t) for c in "wb" for t in "PNBRQK")}
+
 
+class Euristiche:
+    """
+    Tabelle di ordinamento conservate per tutta la ricerca (tutte le
+    iterazioni): due killer per ply, storia per (pezzo, casella di arrivo)
+    e contromossa per (partenza, arrivo) della mossa precedente.
+    """
+    __slots__ = ("killer", "storia", "contromossa")
+
+    def __init__(self):
+        self.killer = [[0, 0] for _ in range(MAX_PLY)]
+        self.storia = [0] * (12 * 64)
+        self.contromossa = [0] * 4096
+
+    def taglio(self, board, mossa, ply, profondita, precedente):
+        """Aggiorna le tabelle dopo un beta cut-off (solo mosse tranquille)."""
+        da = mossa & 63
+        a = (mossa >> 6) & 63
+        if board[a >> 3][a & 7] or mossa >> 14 in (core.FLAG_EN_PASSANT, core.FLAG_PROMOZIONE):
+            return
+        killer = self.killer[ply]
+        if killer[0] != mossa:
+            killer[1] = killer[0]
+            killer[0] = mossa
+        i = _INDICE_PEZZO[board[da >> 3][da & 7]] * 64 + a
+        self.storia[i] += profondita * profondita
+        if self.storia[i] > _LIMITE_STORIA:
+            self.storia = [v >> 1 for v in self.storia]
+        if precedente:
+            self.contromossa[precedente & 4095] = mossa
 
-def ordina_mosse(board, mosse, colore):
+
+def ordina_mosse(board, mosse, colore, euristiche=None, ply=0, mossa_tt=0, precedente=0):
     """
     Ordina le mosse per migliorare l'efficienza del pruning:
-    1. Catture di pezzi preziosi
-    2. Mosse verso il centro
-    3. Altre mosse
+    1. Mossa della tabella delle trasposizioni
+    2. Catture di pezzi preziosi (MVV-LVA) e promozioni a donna
+    3. Killer del ply, poi contromossa alla mossa precedente
+    4. Altre mosse: storia, poi verso il centro
+    Senza euristiche valgono solo i criteri statici (2 e centro).
     """
-    def punteggio_mossa(mossa):
-        start, end = mossa
-        score = 0
-        
-        # Catture (priorità alta)
-        pezzo_catturato = board[end[0]][end[1]]
-        if pezzo_catturato:
-            score += VALORI_PEZZI[pezzo_catturato[1]] * 10
-            # MVV-LVA: Most Valuable Victim - Least Valuable Attacker
-            pezzo_attaccante = board[start[0]][start[1]]
-            score -= VALORI_PEZZI[pezzo_attaccante[1]]
-        
-        # Mosse centrali
-        r, c = end
-        distanza_centro = abs(3.5 - r) + abs(3.5 - c)
-        score += (7 - distanza_centro) * 2
-        
-        return score
+    if euristiche is not None:
+        killer1, killer2 = euristiche.killer[ply]
+        contro = euristiche.contromossa[precedente & 4095] if precedente else 0
+        storia = euristiche.storia
+    else:
+        killer1 = killer2 = contro = 0
+        storia = None
     
-    return sorted(mosse, key=punteggio_mossa, reverse=True)
+    chiavi = []
+    for m in mosse:
+        if m == mossa_tt:
+            p = _P_TT
+        else:
+            da = m & 63
+            a = (m >> 6) & 63
+            vittima = board[a >> 3][a & 7]
+            flag = m >> 14
+            if vittima or flag == core.FLAG_EN_PASSANT:
+                p = _P_CATTURA + _MVV_LVA[vittima[1] if vittima else "P"][board[da >> 3][da & 7][1]]
+                if flag == core.FLAG_PROMOZIONE:
+                    p += (m >> 12) & 3              # donna prima delle sottopromozioni
+            elif flag == core.FLAG_PROMOZIONE and (m >> 12) & 3 == 3:
+                p = _P_CATTURA + VALORI_PEZZI["Q"]
+            elif m == killer1:
+                p = _P_KILLER + 2
+            elif m == killer2:
+                p = _P_KILLER + 1
+            elif m == contro:
+                p = _P_KILLER
+            else:
+                p = _CENTRO[a]
+                if storia is not None:
+                    p += storia[_INDICE_PEZZO[board[da >> 3][da & 7]] * 64 + a]
+        chiavi.append(p << 16 | m)
+    chiavi.sort(reverse=True)
+    return [k & 0xFFFF for k in chiavi]
 
 
 # ============================================================
-# MINIMAX CON ALPHA-BETA PRUNING
+# NEGAMAX CON ALPHA-BETA PRUNING E TABELLA DELLE TRASPOSIZIONI
 # ============================================================
 
-def minimax(board, profondita, alpha, beta, massimizza, colore_bot, stats):
+MATTO = 100000          # punteggio dello scacco matto
+INFINITO = 1000000      # oltre ogni punteggio possibile (finestra iniziale)
+VITTORIA_FINALE = MATTO // 2    # vittoria certa dalle tablebase, meno le semimosse al matto
+
+# Tabella condivisa tra le mosse della partita (creata alla prima ricerca)
+_tabella = None
+
+# Libri d'aperture aperti (percorso -> LibroAperture, None se non leggibile)
+_libri = {}
+
+# Tablebase aperte (cartella -> TabelleFinali, None se vuota)
+_finali = {}
+
+# Ogni quanti nodi si controlla l'orologio (potenza di 2 meno 1)
+_CONTROLLO_TEMPO = 1023
+
+# Quiescenza: margine del delta pruning
+MARGINE_DELTA = 200
+
+# Semiampiezza iniziale della finestra di aspirazione alla radice
+FINESTRA_ASPIRAZIONE = 50
+
+# Null move: riduzione R (R+1 oltre PROFONDITA_NULL_EXTRA) e profondità minima
+RIDUZIONE_NULL = 2
+PROFONDITA_NULL_MIN = 3
+PROFONDITA_NULL_EXTRA = 6
+
+# Late move reductions: mosse tranquille oltre le prime LMR_MOSSE
+LMR_MOSSE = 3
+LMR_PROFONDITA_MIN = 3
+LMR_MOSSE_TARDE = 8     # da qui in poi si riduce di 2 ply
+
+
+class TempoScaduto(Exception):
+    """Budget di tempo esaurito (o ricerca fermata): interrompe l'iterazione in corso."""
+
+
+class Ricerca:
+    """Stato condiviso da tutti i nodi di una ricerca: tabelle, scadenza, statistiche."""
+    __slots__ = ("tt", "euristiche", "scadenza", "stop", "pv", "null_move", "lmr",
+                 "profondita", "nodi", "qnodi", "pruning", "tagli_primo", "tagli_tt", "ri_ricerche",
+                 "tagli_null", "riduzioni", "finali", "tagli_finali")
+
+    def __init__(self, tt, scadenza=None, null_move=True, lmr=True, finali=None):
+        self.tt = tt
+        self.euristiche = Euristiche()
+        self.scadenza = scadenza            # perf_counter oltre il quale si interrompe
+        self.stop = None                    # Event che ferma la ricerca dall'esterno
+        self.null_move = null_move          # interruttori da config.json (A/B)
+        self.lmr = lmr
+        # Variante principale triangolare: pv[ply] = linea migliore da quel ply
+        self.pv = [()] * (MAX_PLY + 1)
+        self.profondita = 0                 # ultima iterazione completata
+        self.nodi = self.qnodi = 0
+        self.pruning = self.tagli_primo = self.tagli_tt = 0
+        self.ri_ricerche = 0                # finestre nulle/aspirazione fallite
+        self.tagli_null = self.riduzioni = 0
+        # Tablebase della cartella 'finali' (anche nei worker: aperte per processo)
+        self.finali = tabelle_finali(finali)
+        self.tagli_finali = 0
+
+
+def tempo_ricerca_ms(config=None):
+    """
+    Budget per mossa del bot: 'bot_movetime_ms' se presente, altrimenti
+    un decimo di 'timer' (secondi per mossa), altrimenti 1 secondo.
     """
-    Algoritmo Minimax con Alpha-Beta Pruning.
+    config = config or {}
+    if config.get("bot_movetime_ms"):
+        return config["bot_movetime_ms"]
+    if config.get("timer"):
+        return config["timer"] * 100
+    return 1000
+
+
+def tabella_trasposizione(config=None):
+    """Ritorna la tabella del bot, ricreandola se cambia 'tt_mb' in config."""
+    global _tabella
+    mb = (config or {}).get("tt_mb", 16)
+    if _tabella is None or _tabella.mb != mb:
+        _tabella = TabellaTrasposizione(mb)
+    return _tabella
+
+
+def libro_aperture(config=None):
+    """Libro indicato da 'bot_libro' in config (aperto una volta sola), oppure None."""
+    percorso = (config or {}).get("bot_libro")
+    if not percorso:
+        return None
+    if percorso not in _libri:
+        try:
+            _libri[percorso] = LibroAperture(percorso)
+        except (OSError, ValueError) as e:
+            print(f"[BOT] Libro d'aperture non disponibile: {e}")
+            _libri[percorso] = None
+    return _libri[percorso]
+
+
+def tabelle_finali(cartella):
+    """Tablebase della cartella (aperte una volta per processo), None se non ce ne sono."""
+    if not cartella:
+        return None
+    if cartella not in _finali:
+        tabelle = TabelleFinali(cartella)
+        _finali[cartella] = tabelle if tabelle.max_pezzi else None
+    return _finali[cartella]
+
+
+def valore_finale(esito, semimosse):
+    """Esito delle tablebase -> punteggio per chi muove (più alto se il matto è vicino)."""
+    if not esito:
+        return 0
+    return esito * (VITTORIA_FINALE - semimosse)
+
+
+def _tt_prima(mosse, mossa_tt):
+    """Porta in testa la mossa suggerita dalla tabella (se legale qui)."""
+    if mossa_tt and mossa_tt in mosse:
+        mosse.remove(mossa_tt)
+        mosse.insert(0, mossa_tt)
+    return mosse
+
+
+def _conta_nodo(ricerca):
+    ricerca.nodi += 1
+    if not ricerca.nodi & _CONTROLLO_TEMPO and (
+            ricerca.scadenza and time.perf_counter() > ricerca.scadenza
+            or ricerca.stop is not None and ricerca.stop.is_set()):
+        raise TempoScaduto
+
+
+def _ordina_catture(board, catture):
+    """MVV-LVA: prima la vittima più preziosa, poi l'attaccante meno prezioso."""
+    chiavi = []
+    for m in catture:
+        da = m & 63
+        a = (m >> 6) & 63
+        vittima = board[a >> 3][a & 7]
+        chiavi.append(_MVV_LVA[vittima[1] if vittima else "P"][board[da >> 3][da & 7][1]] << 16 | m)
+    chiavi.sort(reverse=True)
+    return [k & 0xFFFF for k in chiavi]
+
+
+def quiescenza(pos, alpha, beta, ricerca):
+    """
+    Ricerca delle sole catture/promozioni alle foglie (fail-soft):
+    evita di valutare una posizione con un pezzo appena messo in presa.
+    Chi muove può sempre "stare fermo" (stand-pat) e tenere la valutazione
+    statica; le catture che non possono alzare alpha nemmeno vincendo
+    il pezzo preso più MARGINE_DELTA vengono saltate (delta pruning).
+    """
+    ricerca.qnodi += 1
+    _conta_nodo(ricerca)
+    
+    board = pos.board
+    migliore = valuta(pos)
+    if migliore >= beta:
+        return migliore
+    if migliore > alpha:
+        alpha = migliore
+    
+    for mossa in _ordina_catture(board, core.genera_catture_legali(pos)):
+        a = (mossa >> 6) & 63
+        vittima = board[a >> 3][a & 7]
+        guadagno = VALORI_PEZZI[vittima[1]] if vittima else VALORI_PEZZI["P"]
+        if mossa >> 14 == core.FLAG_PROMOZIONE:
+            guadagno += VALORI_PEZZI["Q"] - VALORI_PEZZI["P"]
+        if migliore + guadagno + MARGINE_DELTA <= alpha:
+            continue
+        
+        core.make_move(pos, mossa)
+        valore = -quiescenza(pos, -beta, -alpha, ricerca)
+        core.unmake_move(pos)
+        
+        if valore > migliore:
+            migliore = valore
+            if valore > alpha:
+                alpha = valore
+                if alpha >= beta:
+                    break
+    return migliore
+
+
+def _solo_pedoni_e_re(board, colore):
+    """Nessun pezzo oltre a pedoni e re: rischio di zugzwang, niente null move."""
+    for riga in board:
+        for p in riga:
+            if p and p[0] == colore and p[1] not in "PK":
+                return False
+    return True
+
+
+def negamax(pos, profondita, alpha, beta, ply, ricerca):
+    """
+    Alpha-beta in forma negamax (fail-soft) con Principal Variation Search:
+    la prima mossa (la più promettente) ha la finestra piena, le altre
+    una finestra nulla che dice solo se superano alpha; se lo fanno
+    vengono ricercate con la finestra piena. Aggiorna ricerca.pv[ply].
+    
+    Null move: se anche passando il turno l'avversario non scende sotto
+    beta (ricerca ridotta), il nodo viene tagliato. Late move reductions:
+    le mosse tranquille in fondo alla lista si cercano prima ridotte e si
+    ricercano a profondità piena solo se superano alpha.
     
     Args:
-        board: scacchiera corrente
+        pos: Position corrente (modificata e ripristinata in place)
         profondita: profondità rimanente di ricerca
-        alpha: miglior valore per il massimizzatore
-        beta: miglior valore per il minimizzatore
-        massimizza: True se turno del bot, False altrimenti
-        colore_bot: colore del bot ('w' o 'b')
-        stats: dizionario per statistiche (nodi visitati, pruning)
+        alpha, beta: finestra dal punto di vista di chi muove
+        ply: distanza dalla radice (indice delle killer)
+        ricerca: Ricerca (tabelle, scadenza e statistiche)
     
     Returns:
-        Valore della posizione
+        Valore della posizione per il giocatore al tratto
+    
+    Raises:
+        TempoScaduto: scadenza superata (la Position resta a meta' ricerca)
     """
-    stats['nodi'] += 1
+    _conta_nodo(ricerca)
+    ricerca.pv[ply] = ()
     
-    # Condizioni di terminazione
-    colore_turno = colore_bot if massimizza else ('w' if colore_bot == 'b' else 'b')
-    stato = core.stato_partita(board, colore_turno)
+    # Finale con pochi pezzi: valore esatto dalle tablebase
+    finali = ricerca.finali
+    if finali is not None and pos.pezzi <= finali.max_pezzi:
+        esito = finali.sonda(pos)
+        if esito is not None:
+            ricerca.tagli_finali += 1
+            return valore_finale(*esito)
     
-    if stato == "checkmate":
-        # Scacco matto: massima penalità/vantaggio
-        return -100000 if massimizza else 100000
+    if profondita == 0:
+        # Foglia: solo catture fino a una posizione "quieta"
+        return quiescenza(pos, alpha, beta, ricerca)
     
-    if stato == "stalemate":
-        # Stallo: pareggio
-        return 0
+    # Trasposizione: stessa posizione gia' cercata almeno a questa profondità
+    tt = ricerca.tt
+    mossa_tt = 0
+    voce = tt.sonda(pos.hash)
+    if voce:
+        valore_tt, profondita_tt, limite, mossa_tt = voce
+        if profondita_tt >= profondita:
+            if (limite == ESATTO
+                    or (limite == INFERIORE and valore_tt >= beta)
+                    or (limite == SUPERIORE and valore_tt <= alpha)):
+                ricerca.tagli_tt += 1
+                return valore_tt
     
-    if profondita == 0:
-        # Foglia: valuta posizione
-        return valuta_posizione(board, colore_bot)
+    in_scacco = core.re_sotto_scacco(pos)
+    precedente = core.ultima_mossa(pos)
+    board = pos.board
+    
+    # Null move (mai due di fila, mai sotto scacco o con soli pedoni e re)
+    if (ricerca.null_move and profondita >= PROFONDITA_NULL_MIN and not in_scacco
+            and precedente and abs(beta) < MATTO
+            and not _solo_pedoni_e_re(board, pos.turno)
+            and valuta(pos) >= beta):
+        r = RIDUZIONE_NULL + (profondita > PROFONDITA_NULL_EXTRA)
+        core.make_null_move(pos)
+        valore = -negamax(pos, max(0, profondita - 1 - r), -beta, -beta + 1, ply + 1, ricerca)
+        core.unmake_null_move(pos)
+        if valore >= beta:
+            ricerca.tagli_null += 1
+            return beta if valore >= MATTO else valore
     
-    # Genera e ordina mosse
-    mosse = lista_mosse_valide(board, colore_turno)
-    mosse = ordina_mosse(board, mosse, colore_turno)
+    # Mosse generate una sola volta: matto e stallo si ricavano da qui
+    mosse = lista_mosse_valide(pos, pos.turno)
     
     if not mosse:
-        # Nessuna mossa disponibile
-        return valuta_posizione(board, colore_bot)
-    
-    if massimizza:
-        max_eval = float('-inf')
-        for mossa in mosse:
-            # Simula mossa
-            temp_board = [row[:] for row in board]
-            start, end = mossa
-            temp_board[end[0]][end[1]] = temp_board[start[0]][start[1]]
-            temp_board[start[0]][start[1]] = ""
-            
-            # Ricorsione
-            eval_pos = minimax(temp_board, profondita - 1, alpha, beta, False, colore_bot, stats)
-            max_eval = max(max_eval, eval_pos)
-            alpha = max(alpha, eval_pos)
-            
-            if beta <= alpha:
-                stats['pruning'] += 1
-                break  # Beta cut-off
+        # Scacco matto: massima penalità; stallo: pareggio
+        return -MATTO if in_scacco else 0
+    
+    euristiche = ricerca.euristiche
+    mosse = ordina_mosse(board, mosse, pos.turno, euristiche, ply, mossa_tt, precedente)
+    riduci = ricerca.lmr and profondita >= LMR_PROFONDITA_MIN and not in_scacco
+    
+    alpha_iniziale = alpha
+    migliore, migliore_mossa = -INFINITO, 0
+    for i, mossa in enumerate(mosse):
+        # Tranquilla: né cattura, né promozione, né killer
+        tranquilla = (riduci and i >= LMR_MOSSE and mossa >> 14 in (0, core.FLAG_ARROCCO)
+                      and not board[(mossa >> 9) & 7][(mossa >> 6) & 7]
+                      and mossa not in euristiche.killer[ply])
+        core.make_move(pos, mossa)
+        if i == 0:
+            valore = -negamax(pos, profondita - 1, -beta, -alpha, ply + 1, ricerca)
+        else:
+            riduzione = 0
+            if tranquilla and not core.re_sotto_scacco(pos):
+                riduzione = 1 if i < LMR_MOSSE_TARDE or profondita < 4 else 2
+                ricerca.riduzioni += 1
+            valore = -negamax(pos, profondita - 1 - riduzione, -alpha - 1, -alpha, ply + 1, ricerca)
+            if riduzione and valore > alpha:
+                valore = -negamax(pos, profondita - 1, -alpha - 1, -alpha, ply + 1, ricerca)
+            if alpha < valore < beta:
+                ricerca.ri_ricerche += 1
+                valore = -negamax(pos, profondita - 1, -beta, -alpha, ply + 1, ricerca)
+        core.unmake_move(pos)
         
-        return max_eval
+        if valore > migliore:
+            migliore, migliore_mossa = valore, mossa
+            if valore > alpha:
+                alpha = valore
+                ricerca.pv[ply] = (mossa,) + ricerca.pv[ply + 1]
+                if alpha >= beta:
+                    ricerca.pruning += 1
+                    if i == 0:
+                        ricerca.tagli_primo += 1
+                    euristiche.taglio(board, mossa, ply, profondita, precedente)
+                    break  # Cut-off
+    
+    if migliore <= alpha_iniziale:
+        limite = SUPERIORE
+        migliore_mossa = 0                  # nessuna mossa ha alzato alpha
+    elif migliore >= beta:
+        limite = INFERIORE
     else:
-        min_eval = float('inf')
-        for mossa in mosse:
-            # Simula mossa
-            temp_board = [row[:] for row in board]
-            start, end = mossa
-            temp_board[end[0]][end[1]] = temp_board[start[0]][start[1]]
-            temp_board[start[0]][start[1]] = ""
-            
-            # Ricorsione
-            eval_pos = minimax(temp_board, profondita - 1, alpha, beta, True, colore_bot, stats)
-            min_eval = min(min_eval, eval_pos)
-            beta = min(beta, eval_pos)
-            
-            if beta <= alpha:
-                stats['pruning'] += 1
-                break  # Alpha cut-off
-        
-        return min_eval
+        limite = ESATTO
+    tt.salva(pos.hash, profondita, migliore, limite, migliore_mossa)
+    return migliore
 
 
 # ============================================================
 # FUNZIONE PRINCIPALE BOT
 # ============================================================
 
-def scegli_mossa_bot(board, colore="b", config=None):
+def _cerca_radice(pos, mosse, profondita, alpha, beta, ricerca):
+    """
+    Una iterazione completa sulle mosse della radice (PVS come in negamax)
+    nella finestra (alpha, beta): (mossa, valore). Un valore fuori dalla
+    finestra e' solo un limite e va ricercato con una finestra più ampia.
+    """
+    alpha_iniziale = alpha
+    migliore_mossa = mosse[0]
+    migliore_valore = -INFINITO
+    ricerca.pv[0] = ()
+    
+    for i, mossa in enumerate(mosse):
+        # Applica mossa in place
+        core.make_move(pos, mossa)
+        
+        # Valuta con negamax (punteggio dell'avversario, cambiato di segno)
+        if i == 0:
+            valore = -negamax(pos, profondita - 1, -beta, -alpha, 1, ricerca)
+        else:
+            valore = -negamax(pos, profondita - 1, -alpha - 1, -alpha, 1, ricerca)
+            if alpha < valore < beta:
+                ricerca.ri_ricerche += 1
+                valore = -negamax(pos, profondita - 1, -beta, -alpha, 1, ricerca)
+        core.unmake_move(pos)
+        
+        if valore > migliore_valore:
+            migliore_valore = valore
+            migliore_mossa = mossa
+            if valore > alpha:
+                alpha = valore
+                ricerca.pv[0] = (mossa,) + ricerca.pv[1]
+                if alpha >= beta:
+                    break
+    
+    if alpha_iniziale < migliore_valore < beta:
+        ricerca.tt.salva(pos.hash, profondita, migliore_valore, ESATTO, migliore_mossa)
+    return migliore_mossa, migliore_valore
+
+
+# ============================================================
+# RICERCA PARALLELA SU PIÙ PROCESSI
+# ============================================================
+# 'bot_parallelo' in config.json:
+#   "radice": mosse della radice divise tra i worker (alpha condiviso)
+#   "smp":    Lazy SMP, tutti i worker cercano la stessa posizione a
+#             profondità sfalsate su un'unica tabella in memoria condivisa
+
+# Pool di processi tenuto caldo tra una mossa e l'altra (vedi _pool_ricerca)
+_pool = None
+_pool_chiave = None                 # (worker, tt_mb, modo) con cui è stato creato
+_pool_alpha = None                  # alpha condiviso con i worker del pool
+_pool_stop = None                   # Event: ferma tutti i worker SMP
+_pool_tt = None                     # tabella condivisa (solo modo "smp")
+_ricerche_avviate = 0               # identifica la ricerca corrente nei worker
+
+# Stato di ciascun processo worker (impostato da _avvia_worker)
+_alpha_condiviso = None             # multiprocessing.Value: miglior valore alla radice
+_stop_condiviso = None
+_euristiche_worker = None
+_ricerca_worker = -1
+
+# Lazy SMP: l'helper i salta blocchi di 'dimensione' profondità con
+# fase diversa, così i processi non cercano tutti la stessa iterazione
+_SALTI_DIMENSIONE = (1, 1, 2, 2, 2, 2, 3, 3, 3, 3, 3, 3, 4, 4, 4, 4, 4, 4, 4, 4)
+_SALTI_FASE = (0, 1, 0, 1, 2, 3, 0, 1, 2, 3, 4, 5, 0, 1, 2, 3, 4, 5, 6, 7)
+
+
+def _avvia_worker(alpha, stop, tt_mb, nome_tt):
+    """Inizializzatore del worker: valori condivisi e tabella (privata o condivisa)."""
+    global _alpha_condiviso, _stop_condiviso, _tabella
+    _alpha_condiviso = alpha
+    _stop_condiviso = stop
+    if nome_tt:
+        _tabella = TabellaTrasposizione.collega(nome_tt, tt_mb)
+    else:
+        _tabella = TabellaTrasposizione(tt_mb)
+
+
+def _pronto():
+    return True
+
+
+def _pool_ricerca(config):
+    """
+    Pool di 'bot_workers' processi (None se <= 1), creato alla prima
+    ricerca e riusato finché worker, 'tt_mb' e 'bot_parallelo' non cambiano.
+    """
+    global _pool, _pool_chiave, _pool_alpha, _pool_stop, _pool_tt
+    workers = config.get("bot_workers", 1)
+    if workers <= 1:
+        return None
+    chiave = (workers, config.get("tt_mb", 16), config.get("bot_parallelo", "radice"))
+    if _pool is None or _pool_chiave != chiave:
+        chiudi_pool()
+        # spawn e non fork: il pool nasce anche dal thread di RicercaInBackground
+        # mentre girano i thread di pygame/SDL, e un fork li lascerebbe a metà
+        contesto = multiprocessing.get_context("spawn")
+        _pool_alpha = contesto.Value("i", -INFINITO)
+        _pool_stop = contesto.Event()
+        if chiave[2] == "smp":
+            _pool_tt = TabellaTrasposizione.condivisa(chiave[1])
+        _pool = ProcessPoolExecutor(workers, mp_context=contesto, initializer=_avvia_worker,
+                                    initargs=(_pool_alpha, _pool_stop, chiave[1],
+                                              _pool_tt.nome if _pool_tt else None))
+        _pool_chiave = chiave
+        # Avvia subito tutti i processi: la prima mossa non paga l'avvio
+        for futuro in [_pool.submit(_pronto) for _ in range(workers)]:
+            futuro.result()
+    return _pool
+
+
+def chiudi_pool():
+    """Termina i processi della ricerca parallela (uscita dal gioco)."""
+    global _pool, _pool_chiave, _pool_tt
+    if _pool is not None:
+        _pool_stop.set()
+        _pool.shutdown(cancel_futures=True)
+    if _pool_tt is not None:
+        _pool_tt.chiudi()
+    _pool = _pool_chiave = _pool_tt = None
+
+
+def _riarma_stop_pool(ricerca):
+    """Nuovo lavoro per il pool: l'evento riparte spento, salvo ricerca già annullata."""
+    _pool_stop.clear()
+    if ricerca.stop is not None and ricerca.stop.is_set():
+        _pool_stop.set()
+
+
+def _ricerca_del_worker(opzioni, id_ricerca):
+    """Ricerca nel worker: euristiche tenute per tutta la mossa della partita."""
+    global _euristiche_worker, _ricerca_worker
+    if id_ricerca != _ricerca_worker:
+        # Nuova mossa della partita: euristiche azzerate, voci vecchie sostituibili
+        _tabella.eta = id_ricerca & 63
+        _euristiche_worker = Euristiche()
+        _ricerca_worker = id_ricerca
+    ricerca = Ricerca(_tabella, **opzioni)
+    ricerca.euristiche = _euristiche_worker
+    return ricerca
+
+
+def _pv_completa(pos, pv, tt, lunghezza):
+    """
+    pv allungata con le mosse migliori della tabella fino a 'lunghezza'
+    mosse: un taglio sulla tabella lascia vuota la pv del nodo figlio.
+    La posizione torna com'era.
+    """
+    pv = list(pv)
+    for mossa in pv:
+        core.make_move(pos, mossa)
+    viste = {pos.hash}
+    while len(pv) < lunghezza:
+        mossa = tt.mossa(pos.hash)
+        if not mossa or mossa not in core.genera_mosse_legali(pos):
+            break
+        core.make_move(pos, mossa)
+        pv.append(mossa)
+        if pos.hash in viste:               # ripetizione: la linea non finisce
+            break
+        viste.add(pos.hash)
+    for _ in pv:
+        core.unmake_move(pos)
+    return tuple(pv)
+
+
+def _cerca_mossa_worker(pos, mossa, profondita, scadenza, opzioni, id_ricerca):
+    """
+    Eseguita nel worker su una copia della posizione: valore di una mossa
+    della radice. Parte con una finestra nulla sull'alpha condiviso (il
+    migliore trovato finora da tutti i processi) e ricerca a finestra
+    piena solo se la mossa lo supera, poi alza l'alpha condiviso.
+    
+    Returns:
+        (mossa, valore, esatto, pv, nodi, qnodi) oppure None se è scaduto il tempo
+    """
+    ricerca = _ricerca_del_worker(opzioni, id_ricerca)
+    ricerca.scadenza = scadenza
+    ricerca.stop = _stop_condiviso
+    
+    core.make_move(pos, mossa)
+    try:
+        alpha = _alpha_condiviso.value
+        if alpha <= -INFINITO:
+            valore = -negamax(pos, profondita - 1, -INFINITO, INFINITO, 1, ricerca)
+        else:
+            valore = -negamax(pos, profondita - 1, -alpha - 1, -alpha, 1, ricerca)
+            if valore > alpha:
+                valore = -negamax(pos, profondita - 1, -INFINITO, -alpha, 1, ricerca)
+    except TempoScaduto:
+        return None
+    
+    esatto = valore > alpha
+    if esatto:
+        with _alpha_condiviso.get_lock():
+            if valore > _alpha_condiviso.value:
+                _alpha_condiviso.value = valore
+    pv = (mossa,) + _pv_completa(pos, ricerca.pv[1], _tabella, profondita - 1) if esatto else (mossa,)
+    return mossa, valore, esatto, pv, ricerca.nodi, ricerca.qnodi
+
+
+def _cerca_radice_parallela(pool, pos, mosse, profondita, ricerca, opzioni, id_ricerca):
     """
-    Sceglie la mossa migliore usando Minimax con alpha-beta pruning.
+    Una iterazione con le mosse della radice divise tra i worker: la
+    prima (la migliore dell'iterazione precedente) viene cercata da sola
+    per fissare un alpha, le altre in parallelo contro l'alpha condiviso.
+    Solleva TempoScaduto se un worker esaurisce il tempo.
+    """
+    _pool_alpha.value = -INFINITO
+    _riarma_stop_pool(ricerca)
+    args = (profondita, ricerca.scadenza, opzioni, id_ricerca)
+    risultati = [pool.submit(_cerca_mossa_worker, pos, mosse[0], *args).result()]
+    if risultati[0] is not None:
+        futuri = [pool.submit(_cerca_mossa_worker, pos, m, *args) for m in mosse[1:]]
+        for futuro in futuri:
+            risultati.append(futuro.result())
+            if risultati[-1] is None:
+                for altro in futuri:
+                    altro.cancel()
+                break
+    
+    migliore = None
+    for r in risultati:
+        if r is None:
+            continue
+        ricerca.nodi += r[4]
+        ricerca.qnodi += r[5]
+        if r[2] and (migliore is None or r[1] > migliore[1]):
+            migliore = r
+    if risultati[-1] is None:
+        raise TempoScaduto
+    ricerca.pv[0] = migliore[3]
+    return migliore[0], migliore[1]
+
+
+def _salta_profondita(indice):
+    """Profondità saltate dal worker SMP 'indice' (None per il principale)."""
+    if indice == 0:
+        return None
+    j = (indice - 1) % len(_SALTI_DIMENSIONE)
+    dimensione, fase = _SALTI_DIMENSIONE[j], _SALTI_FASE[j]
+    return lambda profondita: (profondita + fase) // dimensione % 2 == 1
+
+
+def _cerca_smp_worker(pos, indice, profondita_max, inizio, budget, opzioni, id_ricerca):
+    """
+    Eseguita nel worker: approfondimento iterativo completo sulla posizione,
+    con la tabella condivisa da tutti i processi. Il worker 0 cerca ogni
+    profondità, gli helper ne saltano alcune (vedi _salta_profondita).
+    
+    Returns:
+        (profondità completata, mossa, valore, pv, nodi, qnodi)
+    """
+    ricerca = _ricerca_del_worker(opzioni, id_ricerca)
+    ricerca.stop = _stop_condiviso
+    salta = _salta_profondita(indice)
+    if salta:
+        ricerca.scadenza = inizio + budget
+    colore = pos.turno
+    mosse = ordina_mosse(pos.board, lista_mosse_valide(pos, colore), colore,
+                         mossa_tt=_tabella.mossa(pos.hash))
+    mossa, valore, pv, completata = _approfondimento(pos, mosse, ricerca, profondita_max,
+                                                     inizio, budget, salta=salta, stampa=None)
+    return completata, mossa, valore, pv, ricerca.nodi, ricerca.qnodi
+
+
+def _cerca_smp(pool, workers, pos, profondita_max, inizio, budget, ricerca, opzioni, id_ricerca):
+    """
+    Lazy SMP: tutti i worker cercano la posizione; quando il worker 0
+    termina (profondità massima, matto o tempo) gli helper vengono
+    fermati e vince il risultato completato alla profondità maggiore.
+    """
+    _riarma_stop_pool(ricerca)
+    futuri = [pool.submit(_cerca_smp_worker, pos, i, profondita_max, inizio, budget,
+                          opzioni, id_ricerca) for i in range(workers)]
+    # Decide il worker 0 (cerca ogni profondità): quando termina si
+    # fermano gli helper, che intanto hanno riempito la tabella comune
+    futuri[0].result()
+    _pool_stop.set()
+    risultati = [f.result() for f in futuri]
+    for r in risultati:
+        ricerca.nodi += r[4]
+        ricerca.qnodi += r[5]
+    # A parità di profondità vale il worker con indice più basso
+    completata, mossa, valore, pv = max(risultati, key=lambda r: r[0])[:4]
+    ricerca.profondita = completata
+    print(f"[BOT] SMP: profondità {completata} "
+          f"(worker: {', '.join(str(r[0]) for r in risultati)})")
+    return mossa, valore, pv
+
+
+def _approfondimento(pos, mosse, ricerca, profondita_max, inizio, budget,
+                     radice=None, salta=None, stampa=print):
+    """
+    Approfondimento iterativo sulle mosse della radice (vedi cerca_mossa).
     
     Args:
-        board: scacchiera corrente
-        colore: 'w' o 'b'
-        config: dizionario configurazione (profondità, ecc.)
+        radice: al posto della ricerca con finestra di aspirazione,
+                radice(pos, mosse, profondita, ricerca) -> (mossa, valore)
+        salta: funzione profondità -> True per le iterazioni da saltare
+        stampa: funzione per il resoconto di ogni profondità (None = muto)
     
     Returns:
-        (partenza, arrivo) oppure None
+        (mossa, valore, pv, profondità completata; 0 se nessuna)
     """
+    migliore_mossa = mosse[0]
+    migliore_valore = 0
+    pv = [migliore_mossa]
+    completata = 0
+    
+    for profondita in range(1, profondita_max + 1):
+        if salta and salta(profondita):
+            continue
+        delta = FINESTRA_ASPIRAZIONE
+        if completata >= 2 and abs(migliore_valore) < MATTO:
+            alpha, beta = migliore_valore - delta, migliore_valore + delta
+        else:
+            alpha, beta = -INFINITO, INFINITO
+        try:
+            if radice:
+                mossa, valore = radice(pos, mosse, profondita, ricerca)
+            else:
+                while True:
+                    mossa, valore = _cerca_radice(pos, mosse, profondita, alpha, beta, ricerca)
+                    if valore <= alpha:
+                        alpha = max(valore - delta, -INFINITO)
+                    elif valore >= beta:
+                        beta = min(valore + delta, INFINITO)
+                    else:
+                        break
+                    ricerca.ri_ricerche += 1
+                    delta *= 4
+        except TempoScaduto:
+            if stampa:
+                stampa(f"[BOT] Profondità {profondita} interrotta dal tempo")
+            break
+        migliore_mossa, migliore_valore = mossa, valore
+        completata = ricerca.profondita = profondita
+        pv = list(ricerca.pv[0]) if ricerca.pv[0][:1] == (mossa,) else [mossa]
+        trascorso = time.perf_counter() - inizio
+        if stampa:
+            stampa(f"[BOT] Profondità {profondita}: valore {valore}, {ricerca.nodi} nodi, "
+                   f"{trascorso * 1000:.0f} ms, pv {' '.join(core.mossa_uci(m) for m in pv)}")
+        
+        # La migliore mossa apre l'iterazione successiva
+        mosse = _tt_prima(mosse, mossa)
+        # Matto trovato, oppure la prossima iterazione non finirebbe in tempo
+        if abs(valore) >= MATTO or trascorso > budget / 2:
+            break
+        ricerca.scadenza = inizio + budget
+    
+    return migliore_mossa, migliore_valore, pv, completata
+
+
+def cerca_mossa(pos, colore="b", config=None, stop=None, in_corso=None):
+    """
+    Sceglie la mossa migliore: dal libro d'aperture o dalle tablebase
+    dei finali se la posizione c'è, altrimenti con approfondimento
+    iterativo: ricerche negamax a profondità 1, 2, ... finché il budget
+    di tempo lo consente.
+    Dalla profondità 3 la radice usa una finestra di aspirazione attorno
+    al valore dell'iterazione precedente, allargata se il valore ne esce.
+    Un'iterazione interrotta viene scartata e resta la mossa dell'ultima
+    profondità completata (la profondità 1 viene sempre completata).
+    Una mossa forzata (unica legale) viene giocata subito.
+    
+    Args:
+        pos: Position corrente (non viene modificata: si cerca su una copia)
+        colore: 'w' o 'b' (deve essere il giocatore al tratto)
+        config: dizionario configurazione (bot_depth come limite massimo,
+                bot_movetime_ms / timer per il tempo, tt_mb,
+                bot_null_move / bot_lmr per le potature selettive,
+                bot_workers / bot_parallelo per la ricerca su più processi,
+                bot_libro per il libro d'aperture consultato prima di cercare,
+                bot_finali per la cartella delle tablebase dei finali)
+        stop: threading.Event che interrompe la ricerca (vedi RicercaInBackground)
+        in_corso: oggetto su cui pubblicare la Ricerca (attributo .ricerca)
+                  per leggere profondità e nodi mentre la ricerca procede
+    
+    Returns:
+        (mossa, valore, variante principale come lista di mosse) oppure
+        None se non ci sono mosse legali
+    """
+    global _ricerche_avviate
     if config is None:
         config = {}
     
-    # Profondità di ricerca (3 = buono, 4 = forte, 5+ = molto lento)
-    profondita = config.get("bot_depth", 3)
+    # In apertura la mossa viene dal libro, senza cercare
+    libro = libro_aperture(config)
+    if libro is not None and pos.turno == colore:
+        mossa = libro.mossa(pos)
+        if mossa:
+            print(f"[BOT] Mossa dal libro: {core.mossa_uci(mossa)}")
+            return mossa, 0, [mossa]
+    
+    # Finale nelle tablebase: mossa perfetta, anche qui senza cercare
+    finali = tabelle_finali(config.get("bot_finali"))
+    if finali is not None and pos.turno == colore and pos.pezzi <= finali.max_pezzi:
+        scelta = finali.mossa(pos)
+        if scelta:
+            mossa, esito, semimosse = scelta
+            esito_testo = ("patta" if not esito else
+                           f"{'vince' if esito > 0 else 'perde'}, matto in {semimosse} semimosse")
+            print(f"[BOT] Tablebase: {core.mossa_uci(mossa)} ({esito_testo})")
+            return mossa, valore_finale(esito, semimosse), [mossa]
     
-    mosse = lista_mosse_valide(board, colore)
+    mosse = lista_mosse_valide(pos, colore)
     if not mosse:
         return None
+    # Mossa forzata: nessuna ricerca, il valore è quello statico
+    if len(mosse) == 1:
+        print(f"[BOT] Unica mossa legale: {core.mossa_uci(mosse[0])}")
+        return mosse[0], valuta(pos), [mosse[0]]
     
-    # Ordina mosse per migliorare pruning
-    mosse = ordina_mosse(board, mosse, colore)
+    # Il pool si avvia prima di prendere il tempo: l'avvio dei processi
+    # non è tempo di ricerca
+    pool = _pool_ricerca(config)
+    inizio = time.perf_counter()
+    budget = tempo_ricerca_ms(config) / 1000
+    # Profondità massima: il tempo di solito ferma la ricerca prima
+    profondita_max = min(config.get("bot_depth", 3), MAX_PLY - 1)
+    _ricerche_avviate += 1
+    _pedoni.trovate = _pedoni.mancate = 0
+    if _pool_tt is not None:
+        tt = _pool_tt                       # Lazy SMP: la tabella dei worker
+        tt.eta = _ricerche_avviate & 63
+    else:
+        tt = tabella_trasposizione(config)
+        tt.nuova_ricerca()
+    opzioni = {"null_move": config.get("bot_null_move", True),
+               "lmr": config.get("bot_lmr", True),
+               "finali": config.get("bot_finali")}
+    ricerca = Ricerca(tt, **opzioni)
+    ricerca.stop = stop
+    if in_corso is not None:
+        in_corso.ricerca = ricerca
     
-    migliore_mossa = None
-    migliore_valore = float('-inf')
-    alpha = float('-inf')
-    beta = float('inf')
+    # Copia privata: la partita in corso non viene mai toccata dalla ricerca
+    pos = pos.copia()
     
-    # Statistiche
-    stats = {'nodi': 0, 'pruning': 0}
+    # Ordina mosse per migliorare pruning (prima quella della tabella)
+    mosse = ordina_mosse(pos.board, mosse, colore, mossa_tt=tt.mossa(pos.hash))
     
-    print(f"[BOT] Analizzando {len(mosse)} mosse a profondità {profondita}...")
+    print(f"[BOT] Analizzando {len(mosse)} mosse (max profondità {profondita_max}, "
+          f"{budget * 1000:.0f} ms)...")
     
-    for mossa in mosse:
-        # Simula mossa
-        temp_board = [row[:] for row in board]
-        start, end = mossa
-        temp_board[end[0]][end[1]] = temp_board[start[0]][start[1]]
-        temp_board[start[0]][start[1]] = ""
-        
-        # Valuta con minimax
-        valore = minimax(temp_board, profondita - 1, alpha, beta, False, colore, stats)
-        
-        if valore > migliore_valore:
-            migliore_valore = valore
-            migliore_mossa = mossa
-            alpha = max(alpha, valore)
+    if pool and _pool_tt is not None:
+        migliore_mossa, migliore_valore, pv = _cerca_smp(
+            pool, _pool_chiave[0], pos, profondita_max, inizio, budget,
+            ricerca, opzioni, _ricerche_avviate)
+    else:
+        radice = None
+        if pool:
+            def radice(pos, mosse, profondita, ricerca):
+                return _cerca_radice_parallela(pool, pos, mosse, profondita, ricerca,
+                                               opzioni, _ricerche_avviate)
+        migliore_mossa, migliore_valore, pv, _ = _approfondimento(
+            pos, mosse, ricerca, profondita_max, inizio, budget, radice)
     
-    print(f"[BOT] Nodi esplorati: {stats['nodi']}, Pruning: {stats['pruning']}")
-    print(f"[BOT] Mossa scelta: {migliore_mossa}, Valutazione: {migliore_valore}")
+    primo = 100 * ricerca.tagli_primo // max(1, ricerca.pruning)
+    print(f"[BOT] Nodi esplorati: {ricerca.nodi} (quiescenza {ricerca.qnodi}), "
+          f"Pruning: {ricerca.pruning} ({primo}% alla prima mossa), "
+          f"Ri-ricerche: {ricerca.ri_ricerche}, Null move: {ricerca.tagli_null} tagli, "
+          f"LMR: {ricerca.riduzioni} riduzioni, Tablebase: {ricerca.tagli_finali} sonde, "
+          f"Tabella: {ricerca.tagli_tt} tagli ({tt.riempimento()}‰ piena)")
+    sonde_pedoni = _pedoni.trovate + _pedoni.mancate
+    if sonde_pedoni:                        # con il pool valutano i worker
+        print(f"[BOT] Cache pedoni: {100 * _pedoni.trovate / sonde_pedoni:.1f}% "
+              f"di {sonde_pedoni} sonde")
+    print(f"[BOT] Mossa scelta: {core.caselle_mossa(migliore_mossa)}, Valutazione: {migliore_valore}")
     
-    return migliore_mossa
+    return migliore_mossa, migliore_valore, pv
+
+
+def scegli_mossa_bot(pos, colore="b", config=None):
+    """
+    Mossa del bot (vedi cerca_mossa).
+    
+    Returns:
+        mossa codificata (vedi core.caselle_mossa) oppure None
+    """
+    risultato = cerca_mossa(pos, colore, config)
+    return risultato[0] if risultato else None
+
+
+# ============================================================
+# RICERCA IN BACKGROUND (LA GUI CONTINUA A DISEGNARE)
+# ============================================================
+
+class RicercaInBackground:
+    """
+    cerca_mossa su un thread separato. La GUI chiama pronta() a ogni
+    frame, legge profondita/nodi per l'indicatore e prende il risultato
+    con esito(); annulla() ferma la ricerca al successivo controllo
+    dell'orologio (anche nei worker del pool).
+    """
+
+    def __init__(self, pos, colore="b", config=None):
+        self.stop = threading.Event()
+        self.ricerca = None                 # pubblicata da cerca_mossa
+        self.risultato = None
+        self.errore = None
+        self.inizio = time.perf_counter()
+        self.fine = None                    # impostata quando il thread termina
+        # Copia subito: la partita può cambiare mentre il thread lavora
+        self._thread = threading.Thread(target=self._esegui,
+                                        args=(pos.copia(), colore, config), daemon=True)
+        self._thread.start()
+
+    def _esegui(self, pos, colore, config):
+        try:
+            self.risultato = cerca_mossa(pos, colore, config, self.stop, self)
+        except Exception as e:              # riportata al thread della GUI da esito()
+            self.errore = e
+        finally:
+            self.fine = time.perf_counter()
+
+    def pronta(self):
+        return not self._thread.is_alive()
+
+    def attendi(self):
+        """Aspetta la fine del thread (dopo annulla() è questione di pochi nodi)."""
+        self._thread.join()
+
+    def annulla(self):
+        self.stop.set()
+        if _pool_stop is not None:
+            _pool_stop.set()
+
+    @property
+    def profondita(self):
+        return self.ricerca.profondita if self.ricerca else 0
+
+    @property
+    def nodi(self):
+        return self.ricerca.nodi if self.ricerca else 0
+
+    @property
+    def secondi(self):
+        """Durata della ricerca: fino a ora se è in corso, altrimenti fino alla sua fine."""
+        return (self.fine or time.perf_counter()) - self.inizio
+
+    def esito(self):
+        """(mossa, valore, pv) come cerca_mossa, oppure None; solleva l'errore della ricerca."""
+        if self.errore is not None:
+            raise self.errore
+        return self.risultato
+
+
+# ============================================================
+# PONDERING: RICERCA DURANTE IL TURNO DEL GIOCATORE
+# ============================================================
+
+# Budget del ponder: di fatto illimitato, finisce con annulla() o a bot_depth
+PONDER_MS = 24 * 3600 * 1000
+
+
+class Ponder:
+    """
+    Ricerca in background mentre il giocatore pensa, sulla posizione dopo
+    la sua risposta prevista (pv[1] dell'ultima ricerca del bot). Senza
+    risposta prevista cerca la posizione corrente dal lato del giocatore:
+    le voci in tabella servono qualunque mossa scelga. In ogni caso il
+    lavoro resta nelle tabelle del bot per la ricerca successiva.
+    """
+
+    def __init__(self, pos, colore_bot, pv, config=None):
+        self.prevista = pv[1] if len(pv) > 1 else 0
+        pos = pos.copia()
+        colore = pos.turno
+        if self.prevista:
+            core.make_move(pos, self.prevista)
+            colore = colore_bot
+        self.ricerca = RicercaInBackground(pos, colore,
+                                           dict(config or {}, bot_movetime_ms=PONDER_MS))
+
+    def annulla(self):
+        self.ricerca.annulla()
+
+    def attendi(self):
+        self.ricerca.attendi()
+
+    def dopo_mossa(self, pos, mossa_giocatore, config=None):
+        """
+        Ricerca da cui prendere la risposta del bot dopo la mossa del
+        giocatore. Se era la mossa prevista e il ponder ha già cercato
+        quanto una ricerca normale (tempo o bot_depth), il suo risultato
+        è pronto subito; altrimenti parte una ricerca nuova sulle tabelle
+        già riempite dal ponder.
+        """
+        config = config or {}
+        self.annulla()
+        self.attendi()
+        r = self.ricerca
+        if (mossa_giocatore == self.prevista and r.errore is None and r.profondita
+                and (r.secondi * 1000 >= tempo_ricerca_ms(config)
+                     or r.profondita >= config.get("bot_depth", 3))):
+            print(f"[BOT] Ponder hit: profondità {r.profondita} già completata")
+            return r
+        return RicercaInBackground(pos, pos.turno, config)
 
 
 # ============================================================
 # BOT RANDOM+ (MANTENUTO PER RETROCOMPATIBILITÀ/TESTING)
 # ============================================================
 
-def scegli_mossa_random(board, colore="b"):
+def scegli_mossa_random(pos, colore="b"):
     """Bot casuale puro."""
-    mosse = lista_mosse_valide(board, colore)
+    mosse = lista_mosse_valide(pos, colore)
     return random.choice(mosse) if mosse else None
 
 
-def scegli_mossa_random_plus(board, colore="b"):
+def scegli_mossa_random_plus(pos, colore="b"):
     """Bot euristico semplice (catture + centro)."""
-    mosse = lista_mosse_valide(board, colore)
+    board = pos.board
+    mosse = lista_mosse_valide(pos, colore)
     if not mosse:
         return None
     
     # Catture
-    catture = [m for m in mosse if board[m[1][0]][m[1][1]] != ""]
+    catture = [m for m in mosse if board[(m >> 9) & 7][(m >> 6) & 7] != ""]
     if catture:
         return random.choice(catture)
     
     # Centro
-    centro = {(3, 3), (3, 4), (4, 3), (4, 4)}
-    centrali = [m for m in mosse if m[1] in centro]
+    centro = {27, 28, 35, 36}               # d5, e5, d4, e4
+    centrali = [m for m in mosse if (m >> 6) & 63 in centro]
     if centrali:
         return random.choice(centrali)
     
@@ -1,20 +1,13 @@
 # chess_core.py
 # ============================================================
 #  Engine didattico: regole base + arrocco sicuro, en-passant,
-#  promozione automatica a regina, scacco/matto/stallo
+#  promozione (regina di default), scacco/matto/stallo,
+#  chiave Zobrist e valutazione incrementali della posizione
 # ============================================================
+import random as _random
+from array import array as _array
 
-# ---------- Stato globale --------------------------------------------------
-storico_mosse: list = []
-turno = "w"                           # 'w' bianco, 'b' nero
-
-# Flag di "non ha ancora mosso" (per arrocco)
-w_king_moved = b_king_moved = False
-w_rook_a_moved = w_rook_h_moved = False
-b_rook_a_moved = b_rook_h_moved = False
-
-# Target en-passant del turno successivo (riga, col) oppure None
-en_passant_target = None
+from valutazione import VALORI_CASELLA
 
 # ---------- Board iniziale -------------------------------------------------
 def crea_scacchiera():
@@ -26,19 +19,292 @@ def crea_scacchiera():
         ["wR","wN","wB","wQ","wK","wB","wN","wR"]
     ]
 
-# ---------- Helper geometrici ---------------------------------------------
-def _direzione_libera(board,r0,c0,r1,c1):
-    dr = (r1-r0) and ((r1-r0)//abs(r1-r0))
-    dc = (c1-c0) and ((c1-c0)//abs(c1-c0))
-    r, c = r0+dr, c0+dc
-    while (r,c)!=(r1,c1):
-        if board[r][c]!="": return False
-        r += dr; c += dc
-    return True
+# ---------- Zobrist --------------------------------------------------------
+# Chiavi casuali a 64 bit (seme fisso: stessa posizione -> stessa chiave
+# anche tra processi e sessioni diverse, utile per libri e tabelle su disco)
+_rng = _random.Random(0x5CAC)
+_ZOBRIST_PEZZI = {c+t: [_rng.getrandbits(64) for _ in range(64)]
+                  for c in "wb" for t in "PNBRQK"}
+_ZOBRIST_TURNO = _rng.getrandbits(64)                    # nero muove
+_ZOBRIST_ARROCCO = [_rng.getrandbits(64) for _ in range(16)]
+_ZOBRIST_EP = [_rng.getrandbits(64) for _ in range(8)]   # colonna en-passant
+_ZOBRIST_ARROCCO[0] = 0
+del _rng
+
+def _ep_in_chiave(board,ep,turno):
+    """
+    La colonna en-passant entra nella chiave solo se un pedone di chi
+    muove puo' catturare (cattura pseudo-legale, come nei libri Polyglot):
+    altrimenti la stessa posizione avrebbe due chiavi diverse.
+    """
+    r,c = ep
+    riga = board[3 if r==2 else 4]             # traversa del pedone appena spinto
+    pedone = turno+"P"
+    return (c>0 and riga[c-1]==pedone) or (c<7 and riga[c+1]==pedone)
+
+def calcola_hash(pos):
+    """Chiave Zobrist calcolata da zero (pezzi, turno, arrocco, colonna en-passant)."""
+    h = 0
+    for r in range(8):
+        for c in range(8):
+            p = pos.board[r][c]
+            if p: h ^= _ZOBRIST_PEZZI[p][r*8+c]
+    if pos.turno=="b": h ^= _ZOBRIST_TURNO
+    h ^= _ZOBRIST_ARROCCO[pos.arrocco]
+    ep = pos.en_passant_target
+    if ep and _ep_in_chiave(pos.board,ep,pos.turno): h ^= _ZOBRIST_EP[ep[1]]
+    return h
+
+def calcola_hash_pedoni(pos):
+    """Chiave Zobrist dei soli pedoni (stesse chiavi di calcola_hash): cache della struttura pedonale."""
+    h = 0
+    for r in range(8):
+        for c in range(8):
+            p = pos.board[r][c]
+            if p=="wP" or p=="bP": h ^= _ZOBRIST_PEZZI[p][r*8+c]
+    return h
+
+# ---------- Valutazione incrementale ---------------------------------------
+# Materiale + tabelle posizionali dal punto di vista del bianco:
+# pezzo -> 64 valori (casella riga*8+col), negativi per i pezzi neri.
+_VALORI = VALORI_CASELLA
+_OFFSET_VALUTAZIONE = 1<<19                 # campo a 20 bit nel record di undo
+
+def calcola_valutazione(pos):
+    """Valutazione (bianco positivo) calcolata da zero con le tabelle di valutazione.py."""
+    v = 0
+    for r in range(8):
+        for c in range(8):
+            p = pos.board[r][c]
+            if p: v += _VALORI[p][r*8+c]
+    return v
+
+def conta_pezzi(board):
+    """Pezzi sulla board (re compresi): Position.pezzi lo tiene aggiornato."""
+    return sum(1 for riga in board for p in riga if p)
+
+# ---------- Codifica compatta ----------------------------------------------
+# Mossa = da (6 bit) | a (6 bit) | promozione (2 bit) | flag (2 bit),
+# casella = riga*8 + col (a8 = 0, h1 = 63).
+FLAG_NORMALE, FLAG_PROMOZIONE, FLAG_EN_PASSANT, FLAG_ARROCCO = 0, 1, 2, 3
+_PROMO_PEZZI = "NBRQ"
+
+# Diritti di arrocco (maschera a 4 bit)
+ARR_WK, ARR_WQ, ARR_BK, ARR_BQ = 1, 2, 4, 8
+ARR_TUTTI = 15
+# Diritti che restano quando una casella viene toccata (re o torri di partenza)
+_MANTIENI_ARROCCO = [ARR_TUTTI] * 64
+_MANTIENI_ARROCCO[60] = ARR_BK | ARR_BQ
+_MANTIENI_ARROCCO[63] = ARR_TUTTI ^ ARR_WK
+_MANTIENI_ARROCCO[56] = ARR_TUTTI ^ ARR_WQ
+_MANTIENI_ARROCCO[4]  = ARR_WK | ARR_WQ
+_MANTIENI_ARROCCO[7]  = ARR_TUTTI ^ ARR_BK
+_MANTIENI_ARROCCO[0]  = ARR_TUTTI ^ ARR_BQ
+
+# Codice del pezzo (4 bit): catturato nel record di undo, board di valutazione_batch
+PEZZI_CODICE = [""] + [c+t for c in "wb" for t in "PNBRQK"]
+CODICE_PEZZO = {p: i for i,p in enumerate(PEZZI_CODICE)}
+# Casella en-passant ripristinata da unmake: colonna+1 (0 = nessuna) -> (riga, col)
+_EP_CASE = {"w": [None]+[(2,c) for c in range(8)],
+            "b": [None]+[(5,c) for c in range(8)]}
+# (riga, col) -> casella gia' spostata nel campo "a" della mossa
+_ARRIVO = {(r,c): (r*8+c)<<6 for r in range(8) for c in range(8)}
+_PLY_INIZIALI = 256                         # capienza iniziale dello storico
+
+def codifica_mossa(pos,start,end,promozione="Q"):
+    """(partenza, arrivo) -> mossa intera; i flag dipendono dalla board."""
+    r0,c0 = start; r1,c1 = end
+    m = r0*8+c0 | (r1*8+c1)<<6
+    tp = pos.board[r0][c0][1:]
+    if tp=="P":
+        if r1==0 or r1==7:
+            return m | _PROMO_PEZZI.index(promozione or "Q")<<12 | FLAG_PROMOZIONE<<14
+        if c0!=c1 and pos.board[r1][c1]=="":
+            return m | FLAG_EN_PASSANT<<14
+    elif tp=="K" and abs(c1-c0)==2:
+        return m | FLAG_ARROCCO<<14
+    return m
+
+def caselle_mossa(m):
+    """Mossa intera -> ((r0,c0),(r1,c1)) come usato da GUI e notazione."""
+    da = m & 63; a = m>>6 & 63
+    return (da>>3, da&7), (a>>3, a&7)
+
+def pezzo_promozione(m):
+    """Tipo del pezzo promosso ('N','B','R','Q') oppure None."""
+    return _PROMO_PEZZI[m>>12 & 3] if m>>14==FLAG_PROMOZIONE else None
+
+def mossa_uci(m):
+    """Mossa intera -> notazione UCI ('e2e4', 'e7e8q')."""
+    da = m & 63; a = m>>6 & 63
+    s = "abcdefgh"[da&7] + "87654321"[da>>3] + "abcdefgh"[a&7] + "87654321"[a>>3]
+    return s + _PROMO_PEZZI[m>>12 & 3].lower() if m>>14==FLAG_PROMOZIONE else s
+
+# ---------- Posizione ------------------------------------------------------
+class Position:
+    """
+    Stato completo di una partita: board 8x8, turno, diritti di arrocco,
+    en-passant, orologi e storico. Ogni funzione del modulo riceve la
+    Position esplicitamente, cosi' piu' partite/ricerche possono convivere.
+    """
+    __slots__ = ("board","turno","arrocco",
+                 "en_passant_target","mezze_mosse","numero_mossa",
+                 "storico","ply","hash","hash_pedoni","valutazione","pezzi")
+
+    def __init__(self,board=None):
+        self.board = board if board is not None else crea_scacchiera()
+        self.turno = "w"                        # 'w' bianco, 'b' nero
+        self.arrocco = ARR_TUTTI                # maschera ARR_* dei diritti rimasti
+        # Target en-passant del turno successivo (riga, col) oppure None
+        self.en_passant_target = None
+        self.mezze_mosse = 0                    # regola delle 50 mosse
+        self.numero_mossa = 1
+        # Pila di undo preallocata: due interi per semimossa (hash, record)
+        self.storico = _array("Q", bytes(16*_PLY_INIZIALI))
+        self.ply = 0
+        self.hash = calcola_hash(self)          # chiave Zobrist, aggiornata da make/unmake
+        self.hash_pedoni = calcola_hash_pedoni(self)    # solo pedoni, idem
+        self.valutazione = calcola_valutazione(self)    # materiale + PST, idem
+        self.pezzi = conta_pezzi(self.board)    # pezzi sulla board, idem
+
+    def copia(self):
+        """Copia indipendente (board e storico inclusi)."""
+        nuova = Position.__new__(Position)
+        nuova.board = [row[:] for row in self.board]
+        nuova.turno = self.turno
+        nuova.arrocco = self.arrocco
+        nuova.en_passant_target = self.en_passant_target
+        nuova.mezze_mosse = self.mezze_mosse
+        nuova.numero_mossa = self.numero_mossa
+        nuova.storico = self.storico[:]
+        nuova.ply = self.ply
+        nuova.hash = self.hash
+        nuova.hash_pedoni = self.hash_pedoni
+        nuova.valutazione = self.valutazione
+        nuova.pezzi = self.pezzi
+        return nuova
+
+# ---------- FEN ------------------------------------------------------------
+_FEN_PEZZI = {ch: ("w" if ch.isupper() else "b")+ch.upper() for ch in "PNBRQKpnbrqk"}
+_FEN_SIMBOLI = {v: k for k,v in _FEN_PEZZI.items()}
+_FEN_VUOTE = {str(n): [""]*n for n in range(1,9)}
+_FEN_ARROCCO = (("K",ARR_WK),("Q",ARR_WQ),("k",ARR_BK),("q",ARR_BQ))
+_COLONNE, _RIGHE = "abcdefgh", "87654321"
+
+def da_fen(fen):
+    """
+    Crea una Position da una stringa FEN. I campi orologio sono opzionali.
+    Solleva ValueError se la FEN non e' valida.
+    """
+    campi = fen.split()
+    if len(campi) < 4:
+        raise ValueError(f"FEN incompleta: {fen!r}")
+    righe = campi[0].split("/")
+    if len(righe) != 8:
+        raise ValueError(f"FEN con {len(righe)} traverse: {fen!r}")
+    board = []
+    try:
+        for riga in righe:
+            celle = []
+            for ch in riga:
+                if ch in _FEN_VUOTE: celle += _FEN_VUOTE[ch]
+                else:                celle.append(_FEN_PEZZI[ch])
+            if len(celle) != 8: raise ValueError
+            board.append(celle)
+    except (KeyError, ValueError):
+        raise ValueError(f"Traversa FEN non valida: {fen!r}") from None
+    if campi[1] not in ("w","b"):
+        raise ValueError(f"Turno FEN non valido: {campi[1]!r}")
+
+    pos = Position.__new__(Position)
+    pos.board = board
+    pos.turno = campi[1]
+    pos.arrocco = 0
+    for ch,bit in _FEN_ARROCCO:
+        if ch in campi[2]: pos.arrocco |= bit
+    ep = campi[3]
+    if ep == "-":
+        pos.en_passant_target = None
+    elif len(ep)==2 and ep[0] in _COLONNE and ep[1] in "36":
+        pos.en_passant_target = (_RIGHE.index(ep[1]), _COLONNE.index(ep[0]))
+    else:
+        raise ValueError(f"Casella en-passant FEN non valida: {ep!r}")
+    pos.mezze_mosse = int(campi[4]) if len(campi) > 4 else 0
+    pos.numero_mossa = int(campi[5]) if len(campi) > 5 else 1
+    pos.storico = _array("Q", bytes(16*_PLY_INIZIALI))
+    pos.ply = 0
+    pos.hash = calcola_hash(pos)
+    pos.hash_pedoni = calcola_hash_pedoni(pos)
+    pos.valutazione = calcola_valutazione(pos)
+    pos.pezzi = conta_pezzi(board)
+    return pos
+
+def a_fen(pos):
+    """Serializza la Position in FEN (sei campi)."""
+    righe = []
+    for riga in pos.board:
+        out, vuote = "", 0
+        for p in riga:
+            if p:
+                if vuote: out += str(vuote); vuote = 0
+                out += _FEN_SIMBOLI[p]
+            else:
+                vuote += 1
+        if vuote: out += str(vuote)
+        righe.append(out)
+    # Un diritto vale solo con re e torre ancora sulle case iniziali
+    board = pos.board
+    diritti = pos.arrocco
+    arrocco = ""
+    if board[7][4]=="wK":
+        if diritti & ARR_WK and board[7][7]=="wR": arrocco += "K"
+        if diritti & ARR_WQ and board[7][0]=="wR": arrocco += "Q"
+    if board[0][4]=="bK":
+        if diritti & ARR_BK and board[0][7]=="bR": arrocco += "k"
+        if diritti & ARR_BQ and board[0][0]=="bR": arrocco += "q"
+    ep = pos.en_passant_target
+    ep = _COLONNE[ep[1]] + _RIGHE[ep[0]] if ep else "-"
+    return f"{'/'.join(righe)} {pos.turno} {arrocco or '-'} {ep} {pos.mezze_mosse} {pos.numero_mossa}"
+
+def stato_da_fen(fen):
+    """Stato nel formato di salva_stato_completo, pronto per ripristina_stato_completo."""
+    return salva_stato_completo(da_fen(fen))
 
+# ---------- Helper geometrici ---------------------------------------------
 def _libero(board,row,ca,cb):             # inclusi ca..cb
     return all(board[row][c]=="" for c in range(ca,cb+1))
 
+# ---------- Tabelle di offset (calcolate una volta all'import) --------------
+_DIR_TORRE   = ((-1,0),(1,0),(0,-1),(0,1))
+_DIR_ALFIERE = ((-1,-1),(-1,1),(1,-1),(1,1))
+
+def _salti(offsets):
+    return [[[(r+dr,c+dc) for dr,dc in offsets if 0<=r+dr<8 and 0<=c+dc<8]
+             for c in range(8)] for r in range(8)]
+
+def _raggi(direzioni):
+    tab = []
+    for r in range(8):
+        riga = []
+        for c in range(8):
+            raggi = []
+            for dr,dc in direzioni:
+                raggio = []
+                rr, cc = r+dr, c+dc
+                while 0<=rr<8 and 0<=cc<8:
+                    raggio.append((rr,cc)); rr += dr; cc += dc
+                if raggio: raggi.append(raggio)
+            riga.append(raggi)
+        tab.append(riga)
+    return tab
+
+_SALTI_CAVALLO = _salti(((-2,-1),(-2,1),(-1,-2),(-1,2),(1,-2),(1,2),(2,-1),(2,1)))
+_PASSI_RE      = _salti(_DIR_TORRE+_DIR_ALFIERE)
+_RAGGI_TORRE   = _raggi(_DIR_TORRE)
+_RAGGI_ALFIERE = _raggi(_DIR_ALFIERE)
+_RAGGI_DONNA   = [[_RAGGI_TORRE[r][c]+_RAGGI_ALFIERE[r][c] for c in range(8)] for r in range(8)]
+_RAGGI_PEZZO   = {"R":_RAGGI_TORRE, "B":_RAGGI_ALFIERE, "Q":_RAGGI_DONNA}
+
 # ---------- Funzioni scacco & controlli ------------------------------------
 def _trova_re(board,color):
     for r in range(8):
@@ -48,250 +314,517 @@ def _trova_re(board,color):
     return None
 
 def _square_attacked(board,square,attacker):
+    # Ricerca inversa: si parte dalla casella e si guarda chi la raggiunge
     r_sq,c_sq = square
-    for r in range(8):
-        for c in range(8):
+    for r,c in _SALTI_CAVALLO[r_sq][c_sq]:
+        if board[r][c]==attacker+"N": return True
+    for r,c in _PASSI_RE[r_sq][c_sq]:
+        if board[r][c]==attacker+"K": return True
+    # i pedoni bianchi attaccano verso l'alto: stanno una riga sotto
+    r = r_sq+1 if attacker=="w" else r_sq-1
+    if 0<=r<8:
+        pedone = attacker+"P"
+        if c_sq>0 and board[r][c_sq-1]==pedone: return True
+        if c_sq<7 and board[r][c_sq+1]==pedone: return True
+    torre, alfiere, donna = attacker+"R", attacker+"B", attacker+"Q"
+    for raggio in _RAGGI_TORRE[r_sq][c_sq]:
+        for r,c in raggio:
             p = board[r][c]
-            if p and p[0]==attacker:
-                if _mossa_valida_grezza(board,(r,c),(r_sq,c_sq)):
-                    return True
+            if p:
+                if p==torre or p==donna: return True
+                break
+    for raggio in _RAGGI_ALFIERE[r_sq][c_sq]:
+        for r,c in raggio:
+            p = board[r][c]
+            if p:
+                if p==alfiere or p==donna: return True
+                break
     return False
 
-# ---------- Movimento "grezzo" pezzi (senza self-check) ---------------------
-def _mossa_valida_grezza(board,start,end):
-    r0,c0 = start; r1,c1 = end
+# ---------- Mossa valida "sicura" (non lascia re sotto scacco) --------------
+def mossa_valida(pos,start,end):
+    board = pos.board
+    r0,c0 = start
     piece = board[r0][c0]
     if piece=="": return False
-    col, tp = piece
-    dest = board[r1][c1]
-    if dest!="" and dest[0]==col: return False
+    if end not in _mosse_pseudo_pezzo(pos,r0,c0):
+        return False
+    return _lascia_re_sicuro(board,start,end,_trova_re(board,piece[0]))
 
+# ---------- Generatore di mosse ---------------------------------------------
+def _mosse_pseudo_pezzo(pos,r0,c0):
+    """Caselle di arrivo pseudo-legali (il re puo' restare sotto scacco)."""
+    board = pos.board
+    piece = board[r0][c0]
+    col, tp = piece
     if tp=="P":
         dir_ = -1 if col=="w" else 1
-        base  = 6 if col=="w" else 1
-        # avanti 1
-        if c0==c1 and r1==r0+dir_ and board[r1][c1]=="": return True
-        # avanti 2
-        if (c0==c1 and r0==base and r1==r0+2*dir_
-            and board[r0+dir_][c0]=="" and board[r1][c1]==""): return True
-        # cattura diag o en-passant
-        if abs(c1-c0)==1 and r1==r0+dir_:
-            if board[r1][c1]!="" and board[r1][c1][0]!=col: return True
-            if (r1,c1)==en_passant_target: return True
-        return False
-
-    if tp=="R":
-        if r0!=r1 and c0!=c1: return False
-        return _direzione_libera(board,r0,c0,r1,c1)
-
-    if tp=="N":
-        return sorted([abs(r1-r0),abs(c1-c0)])==[1,2]
-
-    if tp=="B":
-        if abs(r1-r0)!=abs(c1-c0): return False
-        return _direzione_libera(board,r0,c0,r1,c1)
-
-    if tp=="Q":
-        ok_linea  = (r0==r1 or c0==c1) and _direzione_libera(board,r0,c0,r1,c1)
-        ok_diag   = abs(r1-r0)==abs(c1-c0) and _direzione_libera(board,r0,c0,r1,c1)
-        return ok_linea or ok_diag
-
-    if tp=="K":
-        # Arrocco
-        if col=="w" and r0==7 and not w_king_moved:
-            if c1-c0==2 and not w_rook_h_moved and _libero(board,7,5,6): return True
-            if c0-c1==2 and not w_rook_a_moved and board[7][1]==board[7][2]==board[7][3]=="": return True
-        if col=="b" and r0==0 and not b_king_moved:
-            if c1-c0==2 and not b_rook_h_moved and _libero(board,0,5,6): return True
-            if c0-c1==2 and not b_rook_a_moved and board[0][1]==board[0][2]==board[0][3]=="": return True
-        # passo singolo
-        return max(abs(r1-r0),abs(c1-c0))==1
-    return False
-
-# ---------- Mossa valida "sicura" (non lascia re sotto scacco) --------------
-def mossa_valida(board,start,end):
-    if not _mossa_valida_grezza(board,start,end):
-        return False
-    # Simula la mossa
-    temp = [row[:] for row in board]
-    _applica_mossa_raw(temp,start,end)
-    col = board[start[0]][start[1]][0]
-    king_sq = _trova_re(temp,col)
-    if _square_attacked(temp,king_sq,'b' if col=='w' else 'w'):
-        return False
-    # Arrocco: verifica che il re non attraversi case attaccate
+        r1 = r0+dir_
+        if 0<=r1<8:
+            if board[r1][c0]=="":
+                yield (r1,c0)
+                base = 6 if col=="w" else 1
+                if r0==base and board[r1+dir_][c0]=="":
+                    yield (r1+dir_,c0)
+            for c1 in (c0-1,c0+1):
+                if 0<=c1<8:
+                    dest = board[r1][c1]
+                    if (dest and dest[0]!=col) or (r1,c1)==pos.en_passant_target:
+                        yield (r1,c1)
+    elif tp=="N" or tp=="K":
+        for r1,c1 in (_SALTI_CAVALLO if tp=="N" else _PASSI_RE)[r0][c0]:
+            dest = board[r1][c1]
+            if dest=="" or dest[0]!=col:
+                yield (r1,c1)
+        if tp=="K":
+            # Arrocco: le case attraversate vengono controllate qui
+            nemico = 'b' if col=='w' else 'w'
+            riga = 7 if col=="w" else 0
+            corto, lungo = (ARR_WK,ARR_WQ) if col=="w" else (ARR_BK,ARR_BQ)
+            diritti = pos.arrocco
+            if (diritti & (corto|lungo) and (r0,c0)==(riga,4)
+                    and not _square_attacked(board,(riga,4),nemico)):
+                if (diritti & corto and board[riga][7]==col+"R" and _libero(board,riga,5,6)
+                        and not _square_attacked(board,(riga,5),nemico)
+                        and not _square_attacked(board,(riga,6),nemico)):
+                    yield (riga,6)
+                if (diritti & lungo and board[riga][0]==col+"R" and _libero(board,riga,1,3)
+                        and not _square_attacked(board,(riga,3),nemico)
+                        and not _square_attacked(board,(riga,2),nemico)):
+                    yield (riga,2)
+    else:
+        for raggio in _RAGGI_PEZZO[tp][r0][c0]:
+            for r1,c1 in raggio:
+                dest = board[r1][c1]
+                if dest=="":
+                    yield (r1,c1)
+                else:
+                    if dest[0]!=col: yield (r1,c1)
+                    break
+
+def _lascia_re_sicuro(board,start,end,king_sq):
+    """Applica la mossa in place, verifica lo scacco e ripristina la board."""
     r0,c0 = start; r1,c1 = end
+    piece = board[r0][c0]; dest = board[r1][c1]
+    col = piece[0]
+    ep = piece[1]=="P" and c0!=c1 and dest==""
+    if ep:
+        catturato = board[r0][c1]; board[r0][c1] = ""
+    board[r1][c1] = piece; board[r0][c0] = ""
+    sotto_scacco = _square_attacked(board, end if piece[1]=="K" else king_sq,
+                                    'b' if col=='w' else 'w')
+    board[r0][c0] = piece; board[r1][c1] = dest
+    if ep:
+        board[r0][c1] = catturato
+    return not sotto_scacco
+
+def _scacchi_e_inchiodature(board,king_sq,col):
+    """
+    Analizza una volta la posizione dal re di col.
+    Ritorna (scacchi, inchiodati): per ogni pezzo che da' scacco l'insieme
+    delle caselle che lo risolvono (cattura o interposizione), e per ogni
+    pezzo inchiodato l'insieme delle caselle della linea su cui puo' muovere.
+    """
+    nemico = 'b' if col=='w' else 'w'
+    r,c = king_sq
+    scacchi, inchiodati = [], {}
+    for raggi,tipo in ((_RAGGI_TORRE[r][c],"R"),(_RAGGI_ALFIERE[r][c],"B")):
+        for raggio in raggi:
+            mio = None
+            for i,(rr,cc) in enumerate(raggio):
+                p = board[rr][cc]
+                if p=="": continue
+                if p[0]==col:
+                    if mio is not None: break
+                    mio = (rr,cc)
+                    continue
+                if p[1]==tipo or p[1]=="Q":
+                    linea = set(raggio[:i+1])
+                    if mio is None: scacchi.append(linea)
+                    else:           inchiodati[mio] = linea
+                break
+    for rr,cc in _SALTI_CAVALLO[r][c]:
+        if board[rr][cc]==nemico+"N": scacchi.append({(rr,cc)})
+    rr = r-1 if col=="w" else r+1
+    if 0<=rr<8:
+        for cc in (c-1,c+1):
+            if 0<=cc<8 and board[rr][cc]==nemico+"P": scacchi.append({(rr,cc)})
+    return scacchi, inchiodati
+
+def _casa_sicura_re(board,king_sq,end,nemico):
+    """Il re puo' andare su end? Il re viene tolto per vedere i raggi x."""
+    r,c = king_sq
+    re_ = board[r][c]; board[r][c] = ""
+    attaccata = _square_attacked(board,end,nemico)
+    board[r][c] = re_
+    return not attaccata
+
+def _arrivi_legali(pos,r0,c0,king_sq,scacchi,inchiodati):
+    """Caselle di arrivo legali del pezzo su (r0,c0), dati scacchi e inchiodature."""
+    board = pos.board
     piece = board[r0][c0]
-    if piece[1]=="K" and abs(c1-c0)==2:
-        path_cols = (range(c0,c1+1) if c1>c0 else range(c1,c0+1))
-        for col_ in path_cols:
-            if _square_attacked(board,(r0,col_),'b' if piece[0]=='w' else 'w'):
-                return False
-    return True
-
-def _applica_mossa_raw(board,start,end):
-    r0,c0 = start; r1,c1 = end
-    board[r1][c1]=board[r0][c0]
-    board[r0][c0]=""
-
-# ---------- Esegui mossa (con storico) -------------------------------------
-def esegui_mossa(board,start,end):
-    global turno,en_passant_target
-    global w_king_moved,b_king_moved,w_rook_a_moved,w_rook_h_moved,b_rook_a_moved,b_rook_h_moved
-    if not mossa_valida(board,start,end): return False
+    if piece[1]=="K":
+        nemico = 'b' if piece[0]=='w' else 'w'
+        for end in _mosse_pseudo_pezzo(pos,r0,c0):
+            if _casa_sicura_re(board,king_sq,end,nemico):
+                yield end
+        return
+    if len(scacchi)>1:                          # scacco doppio: muove solo il re
+        return
+    blocchi = scacchi[0] if scacchi else None
+    linea = inchiodati.get((r0,c0))
+    for end in _mosse_pseudo_pezzo(pos,r0,c0):
+        if piece[1]=="P" and end[1]!=c0 and board[end[0]][end[1]]=="":
+            # en-passant: due pezzi lasciano la traversa, si simula
+            if _lascia_re_sicuro(board,(r0,c0),end,king_sq):
+                yield end
+            continue
+        if blocchi is not None and end not in blocchi: continue
+        if linea is not None and end not in linea: continue
+        yield end
+
+def mosse_legali_pezzo(pos,start):
+    """Lista delle caselle di arrivo legali per il pezzo su start."""
+    board = pos.board
+    r0,c0 = start
+    piece = board[r0][c0]
+    if piece=="": return []
+    king_sq = _trova_re(board,piece[0])
+    scacchi, inchiodati = _scacchi_e_inchiodature(board,king_sq,piece[0])
+    return list(_arrivi_legali(pos,r0,c0,king_sq,scacchi,inchiodati))
 
-    r0,c0=start; r1,c1=end
+def genera_mosse_legali(pos,color=None):
+    """
+    Tutte le mosse legali del colore indicato (default: chi muove) come
+    interi codificati; ogni promozione produce le quattro scelte (donna prima).
+    """
+    board = pos.board
+    if color is None: color = pos.turno
+    king_sq = _trova_re(board,color)
+    scacchi, inchiodati = _scacchi_e_inchiodature(board,king_sq,color)
+    mosse = []
+    aggiungi = mosse.append
+    for r0 in range(8):
+        riga = board[r0]
+        for c0 in range(8):
+            p = riga[c0]
+            if not p or p[0]!=color: continue
+            da = r0*8+c0
+            arrivi = _arrivi_legali(pos,r0,c0,king_sq,scacchi,inchiodati)
+            if p[1]=="P":
+                for r1,c1 in arrivi:
+                    m = da | (r1*8+c1)<<6
+                    if r1==0 or r1==7:
+                        for i in (3,2,1,0):
+                            aggiungi(m | i<<12 | FLAG_PROMOZIONE<<14)
+                    elif c1!=c0 and board[r1][c1]=="":
+                        aggiungi(m | FLAG_EN_PASSANT<<14)
+                    else:
+                        aggiungi(m)
+            elif p[1]=="K":
+                for r1,c1 in arrivi:
+                    m = da | (r1*8+c1)<<6
+                    aggiungi(m | FLAG_ARROCCO<<14 if abs(c1-c0)==2 else m)
+            else:
+                for end in arrivi:
+                    aggiungi(da | _ARRIVO[end])
+    return mosse
+
+def genera_catture_legali(pos):
+    """
+    Solo catture (en-passant incluso) e promozioni a donna di chi muove:
+    le mosse "rumorose" esplorate dalla ricerca di quiescenza.
+    """
+    board = pos.board
+    color = pos.turno
+    king_sq = _trova_re(board,color)
+    scacchi, inchiodati = _scacchi_e_inchiodature(board,king_sq,color)
+    mosse = []
+    for r0 in range(8):
+        riga = board[r0]
+        for c0 in range(8):
+            p = riga[c0]
+            if not p or p[0]!=color: continue
+            da = r0*8+c0
+            pedone = p[1]=="P"
+            for r1,c1 in _arrivi_legali(pos,r0,c0,king_sq,scacchi,inchiodati):
+                dest = board[r1][c1]
+                if pedone:
+                    m = da | (r1*8+c1)<<6
+                    if r1==0 or r1==7:
+                        mosse.append(m | 3<<12 | FLAG_PROMOZIONE<<14)
+                    elif c1!=c0:
+                        mosse.append(m if dest else m | FLAG_EN_PASSANT<<14)
+                elif dest:
+                    mosse.append(da | (r1*8+c1)<<6)
+    return mosse
+
+# ---------- Make / unmake (ricerca) ---------------------------------------
+def make_move(pos,m):
+    """
+    Applica in place una mossa codificata gia' legale: arrocco (torre
+    inclusa), en-passant e promozione; aggiorna diritti, orologi e turno.
+    Non valida. Lo stato per unmake_move finisce sulla pila pos.storico.
+    """
+    board = pos.board
+    da = m & 63; a = m>>6 & 63; flag = m>>14
+    r0,c0 = da>>3, da&7; r1,c1 = a>>3, a&7
     piece = board[r0][c0]
     dest  = board[r1][c1]
-
-    # Salva stato per undo
-    storico_mosse.append((start,end,dest,en_passant_target,
-                          w_king_moved,b_king_moved,
-                          w_rook_a_moved,w_rook_h_moved,b_rook_a_moved,b_rook_h_moved))
-
-    # ---------- Arrocco ----------
-    if piece[1]=="K" and abs(c1-c0)==2:
-        if c1>c0:    # corto
-            board[r0][6]=piece; board[r0][5]=board[r0][7]; board[r0][7]=""
-            board[r0][c0]=""
-        else:        # lungo
-            board[r0][2]=piece; board[r0][3]=board[r0][0]; board[r0][0]=""
-            board[r0][c0]=""
-    # ---------- En-passant ----------
-    elif piece[1]=="P" and (r1,c1)==en_passant_target:
-        board[r1][c1]=piece; board[r0][c0]=""
-        board[r0][c1]=""                       # pedone catturato
+    ep = pos.en_passant_target
+    vecchio = pos.arrocco
+
+    # Record di undo: hash precedente +
+    # (mossa, catturato, arrocco, ep, valutazione, orologio)
+    st = pos.storico
+    i = pos.ply*2
+    if i==len(st):
+        st.frombytes(bytes(8*len(st)))      # raddoppia la capienza
+    h = pos.hash
+    v = pos.valutazione
+    st[i] = h
+    st[i+1] = (m | CODICE_PEZZO[dest]<<16 | vecchio<<20
+               | (ep[1]+1 if ep else 0)<<24 | (v+_OFFSET_VALUTAZIONE)<<28
+               | pos.mezze_mosse<<48)
+    pos.ply += 1
+
+    z = _ZOBRIST_PEZZI[piece]
+    h ^= z[da] ^ z[a] ^ _ZOBRIST_TURNO
+    t = _VALORI[piece]
+    v += t[a] - t[da]
+    if dest:
+        h ^= _ZOBRIST_PEZZI[dest][a]
+        v -= _VALORI[dest][a]
+        pos.pezzi -= 1
+        if dest[1]=="P": pos.hash_pedoni ^= _ZOBRIST_PEZZI[dest][a]
+    if ep and _ep_in_chiave(board,ep,piece[0]): h ^= _ZOBRIST_EP[ep[1]]
+
+    board[r1][c1] = piece
+    board[r0][c0] = ""
+    if flag==FLAG_PROMOZIONE:
+        nuovo = piece[0]+_PROMO_PEZZI[m>>12 & 3]
+        board[r1][c1] = nuovo
+        h ^= z[a] ^ _ZOBRIST_PEZZI[nuovo][a]
+        v += _VALORI[nuovo][a] - t[a]
+    elif flag==FLAG_EN_PASSANT:
+        preso = board[r0][c1]
+        h ^= _ZOBRIST_PEZZI[preso][r0*8+c1]
+        v -= _VALORI[preso][r0*8+c1]
+        board[r0][c1] = ""
+        pos.pezzi -= 1
+        pos.hash_pedoni ^= _ZOBRIST_PEZZI[preso][r0*8+c1]
+    elif flag==FLAG_ARROCCO:
+        ca, cb = (7,5) if c1>c0 else (0,3)      # corto / lungo
+        torre = board[r0][ca]
+        board[r0][cb] = torre; board[r0][ca] = ""
+        h ^= _ZOBRIST_PEZZI[torre][r0*8+ca] ^ _ZOBRIST_PEZZI[torre][r0*8+cb]
+        t = _VALORI[torre]
+        v += t[r0*8+cb] - t[r0*8+ca]
+    pos.valutazione = v
+
+    # Re o torri che lasciano (o perdono) la casa iniziale
+    if vecchio:
+        arrocco = vecchio & _MANTIENI_ARROCCO[da] & _MANTIENI_ARROCCO[a]
+        if arrocco!=vecchio:
+            pos.arrocco = arrocco
+            h ^= _ZOBRIST_ARROCCO[vecchio] ^ _ZOBRIST_ARROCCO[arrocco]
+    if piece[1]=="P":
+        pos.mezze_mosse = 0
+        pos.hash_pedoni ^= z[da] if flag==FLAG_PROMOZIONE else z[da] ^ z[a]
+        if a-da==16 or da-a==16:
+            pos.en_passant_target = ((r0+r1)>>1,c0)
+            nemico = ("b" if piece[0]=="w" else "w")+"P"
+            riga = board[r1]
+            if (c0>0 and riga[c0-1]==nemico) or (c0<7 and riga[c0+1]==nemico):
+                h ^= _ZOBRIST_EP[c0]
+        else:
+            pos.en_passant_target = None
     else:
-        board[r1][c1]=piece; 
-        board[r0][c0]=""              # casella di partenza diventa vuota
-
-    # ---------- Aggiorna flag movimento ----------
-    if piece=="wK": w_king_moved=True
-    if piece=="bK": b_king_moved=True
-    if piece=="wR" and start==(7,0): w_rook_a_moved=True
-    if piece=="wR" and start==(7,7): w_rook_h_moved=True
-    if piece=="bR" and start==(0,0): b_rook_a_moved=True
-    if piece=="bR" and start==(0,7): b_rook_h_moved=True
-
-    # ---------- Promozione ----------
-    promo = False
-    if piece[1] == "P" and ((piece[0] == "w" and r1 == 0) or (piece[0] == "b" and r1 == 7)):
-        promo = True  # segnalo che è arrivato in ultima riga
-
-    # ---------- Gestione en-passant target ----------
-    en_passant_target = ((r0+r1)//2,c0) if piece[1]=="P" and abs(r1-r0)==2 else None
-
-    turno = 'b' if turno=='w' else 'w'
-    return True
+        pos.mezze_mosse = 0 if dest else pos.mezze_mosse+1
+        pos.en_passant_target = None
+    if piece[0]=="b":
+        pos.numero_mossa += 1
+        pos.turno = "w"
+    else:
+        pos.turno = "b"
+    pos.hash = h
+
+def unmake_move(pos):
+    """Annulla l'ultima mossa applicata con make_move (cima della pila)."""
+    board = pos.board
+    pos.ply -= 1
+    i = pos.ply*2
+    st = pos.storico
+    pos.hash = st[i]
+    rec = st[i+1]
+    da = rec & 63; a = rec>>6 & 63; flag = rec>>14 & 3
+    r0,c0 = da>>3, da&7; r1,c1 = a>>3, a&7
+    piece = board[r1][c1]
+    col = piece[0]
+    if flag==FLAG_PROMOZIONE:
+        piece = col+"P"
+    board[r0][c0] = piece
+    dest = PEZZI_CODICE[rec>>16 & 15]
+    board[r1][c1] = dest
+    if dest:
+        pos.pezzi += 1
+        if dest[1]=="P": pos.hash_pedoni ^= _ZOBRIST_PEZZI[dest][a]
+    if piece[1]=="P":
+        z = _ZOBRIST_PEZZI[piece]
+        pos.hash_pedoni ^= z[da] if flag==FLAG_PROMOZIONE else z[da] ^ z[a]
+    if flag==FLAG_ARROCCO:
+        if c1>c0:
+            board[r0][7] = board[r0][5]; board[r0][5] = ""
+        else:
+            board[r0][0] = board[r0][3]; board[r0][3] = ""
+    elif flag==FLAG_EN_PASSANT:
+        preso = "bP" if col=="w" else "wP"
+        board[r0][c1] = preso
+        pos.pezzi += 1
+        pos.hash_pedoni ^= _ZOBRIST_PEZZI[preso][r0*8+c1]
+    pos.arrocco = rec>>20 & 15
+    pos.en_passant_target = _EP_CASE[col][rec>>24 & 15]
+    pos.valutazione = (rec>>28 & 0xFFFFF) - _OFFSET_VALUTAZIONE
+    pos.mezze_mosse = rec>>48
+    if col=="b": pos.numero_mossa -= 1
+    pos.turno = col
+
+def make_null_move(pos):
+    """
+    Passa il turno senza muovere (null move della ricerca): cancella
+    l'en-passant e aggiorna la chiave. Da annullare con unmake_null_move.
+    """
+    ep = pos.en_passant_target
+    st = pos.storico
+    i = pos.ply*2
+    if i==len(st):
+        st.frombytes(bytes(8*len(st)))
+    h = pos.hash
+    st[i] = h
+    st[i+1] = pos.arrocco<<20 | (ep[1]+1 if ep else 0)<<24 | pos.mezze_mosse<<48
+    pos.ply += 1
+    h ^= _ZOBRIST_TURNO
+    if ep:
+        if _ep_in_chiave(pos.board,ep,pos.turno): h ^= _ZOBRIST_EP[ep[1]]
+        pos.en_passant_target = None
+    pos.hash = h
+    pos.mezze_mosse += 1
+    if pos.turno=="b":
+        pos.numero_mossa += 1
+        pos.turno = "w"
+    else:
+        pos.turno = "b"
+
+def unmake_null_move(pos):
+    pos.ply -= 1
+    i = pos.ply*2
+    pos.hash = pos.storico[i]
+    rec = pos.storico[i+1]
+    col = "b" if pos.turno=="w" else "w"
+    if col=="b": pos.numero_mossa -= 1
+    pos.turno = col
+    pos.en_passant_target = _EP_CASE[col][rec>>24 & 15]
+    pos.mezze_mosse = rec>>48
+
+def ultima_mossa(pos):
+    """Ultima mossa applicata (intero codificato), 0 se lo storico e' vuoto o era nulla."""
+    return pos.storico[2*pos.ply-1] & 0xFFFF if pos.ply else 0
 
-# ---------- Undo -----------------------------------------------------------
-def annulla_mossa(board):
-    global turno,en_passant_target
-    global w_king_moved,b_king_moved,w_rook_a_moved,w_rook_h_moved,b_rook_a_moved,b_rook_h_moved
-    if not storico_mosse: return
-    start,end,catturato,ep,wk,bk,wra,wrh,bra,brh = storico_mosse.pop()
-    r0,c0=start; r1,c1=end
-    piece = board[r1][c1] or board[r0][c0]
+# ---------- Esegui mossa (con storico) -------------------------------------
+def esegui_mossa(pos,start,end,promozione="Q"):
+    if not mossa_valida(pos,start,end): return False
+    make_move(pos,codifica_mossa(pos,start,end,promozione))
+    return True
 
-    # Arrocco
-    if piece[1]=="K" and abs(c1-c0)==2:
-        if c1>c0:   # corto
-            board[r0][c0]=piece; board[r0][7]=board[r0][5]; board[r0][5]=""; board[r0][6]=""
-        else:       # lungo
-            board[r0][c0]=piece; board[r0][0]=board[r0][3]; board[r0][3]=""; board[r0][2]=""
-    # En-passant
-    elif piece[1]=="P" and (r1,c1)==ep and catturato=="":
-        board[r0][c0]=piece; board[r1][c1]=""               # pedone torna
-        board[r0][c1]="bP" if piece[0]=="w" else "wP"       # ripristina catturato
-    else:
-        board[r0][c0]=piece; board[r1][c1]=catturato
+def e_promozione(pos,start,end):
+    """True se la mossa porta un pedone in ultima riga (serve la scelta del pezzo)."""
+    piece = pos.board[start[0]][start[1]]
+    return piece!="" and piece[1]=="P" and end[0] in (0,7)
 
-    en_passant_target = ep
-    w_king_moved,b_king_moved = wk,bk
-    w_rook_a_moved, w_rook_h_moved = wra,wrh
-    b_rook_a_moved, b_rook_h_moved = bra,brh
-    turno = 'b' if turno=='w' else 'w'
+# ---------- Undo -----------------------------------------------------------
+def annulla_mossa(pos):
+    if not pos.ply: return
+    unmake_move(pos)
 
 # ---------- Stato partita --------------------------------------------------
-def _has_legal_move(board,color):
+def _has_legal_move(pos,color,king_sq=None,scacchi=None,inchiodati=None):
+    board = pos.board
+    if king_sq is None:
+        king_sq = _trova_re(board,color)
+        scacchi, inchiodati = _scacchi_e_inchiodature(board,king_sq,color)
+    # Il re per primo: con scacco doppio e' l'unico che puo' muovere
+    for _ in _arrivi_legali(pos,king_sq[0],king_sq[1],king_sq,scacchi,inchiodati):
+        return True
     for r0 in range(8):
         for c0 in range(8):
-            if board[r0][c0] and board[r0][c0][0]==color:
-                for r1 in range(8):
-                    for c1 in range(8):
-                        if mossa_valida(board,(r0,c0),(r1,c1)):
-                            return True
+            p = board[r0][c0]
+            if p and p[0]==color and p[1]!="K":
+                for _ in _arrivi_legali(pos,r0,c0,king_sq,scacchi,inchiodati):
+                    return True
     return False
 
-def stato_partita(board,color_turno):
-    king_sq = _trova_re(board,color_turno)
-    in_check = _square_attacked(board,king_sq,'b' if color_turno=='w' else 'w')
-    has_move = _has_legal_move(board,color_turno)
+def re_sotto_scacco(pos,color=None):
+    if color is None: color = pos.turno
+    king_sq = _trova_re(pos.board,color)
+    return king_sq is not None and _square_attacked(pos.board,king_sq,'b' if color=='w' else 'w')
+
+def stato_partita(pos,color_turno=None):
+    if color_turno is None: color_turno = pos.turno
+    king_sq = _trova_re(pos.board,color_turno)
+    scacchi, inchiodati = _scacchi_e_inchiodature(pos.board,king_sq,color_turno)
+    in_check = bool(scacchi)
+    has_move = _has_legal_move(pos,color_turno,king_sq,scacchi,inchiodati)
     if in_check and not has_move:   return "checkmate"
     if not in_check and not has_move:return "stalemate"
     if in_check:                    return "check"
     return "ok"
 
 # ---------- FUNZIONI REPLAY ------------------------------------------------
-def salva_stato_completo():
+def salva_stato_completo(pos):
     """
     Salva lo stato completo del gioco per permettere replay.
     Returns: dizionario con tutto lo stato
     """
     return {
-        'turno': turno,
-        'en_passant': en_passant_target,
-        'w_king_moved': w_king_moved,
-        'b_king_moved': b_king_moved,
-        'w_rook_a_moved': w_rook_a_moved,
-        'w_rook_h_moved': w_rook_h_moved,
-        'b_rook_a_moved': b_rook_a_moved,
-        'b_rook_h_moved': b_rook_h_moved,
-        'storico_len': len(storico_mosse)
+        'board': [row[:] for row in pos.board],
+        'turno': pos.turno,
+        'en_passant': pos.en_passant_target,
+        'arrocco': pos.arrocco,
+        'mezze_mosse': pos.mezze_mosse,
+        'numero_mossa': pos.numero_mossa,
+        'storico_len': pos.ply,
+        'storico': pos.storico[:2*pos.ply],     # pila di undo fino a qui
+        'hash': pos.hash,
+        'fen': a_fen(pos)
     }
 
 
-def ripristina_stato_completo(stato):
+def ripristina_stato_completo(pos, stato):
     """
     Ripristina lo stato completo del gioco.
-    Args: dizionario stato salvato con salva_stato_completo()
+    Args: Position da aggiornare, dizionario salvato con salva_stato_completo()
     """
-    global turno, en_passant_target
-    global w_king_moved, b_king_moved
-    global w_rook_a_moved, w_rook_h_moved, b_rook_a_moved, b_rook_h_moved
-    global storico_mosse
-    
-    turno = stato['turno']
-    en_passant_target = stato['en_passant']
-    w_king_moved = stato['w_king_moved']
-    b_king_moved = stato['b_king_moved']
-    w_rook_a_moved = stato['w_rook_a_moved']
-    w_rook_h_moved = stato['w_rook_h_moved']
-    b_rook_a_moved = stato['b_rook_a_moved']
-    b_rook_h_moved = stato['b_rook_h_moved']
+    pos.board = [row[:] for row in stato['board']]
+    pos.turno = stato['turno']
+    pos.en_passant_target = stato['en_passant']
+    pos.arrocco = stato['arrocco']
+    pos.mezze_mosse = stato['mezze_mosse']
+    pos.numero_mossa = stato['numero_mossa']
     
-    # Taglia storico alla lunghezza salvata
-    while len(storico_mosse) > stato['storico_len']:
-        storico_mosse.pop()
-
-
-def reset_completo():
-    """Reset completo di tutte le variabili globali."""
-    global turno, en_passant_target, storico_mosse
-    global w_king_moved, b_king_moved
-    global w_rook_a_moved, w_rook_h_moved, b_rook_a_moved, b_rook_h_moved
+    pos.hash = calcola_hash(pos)
+    pos.hash_pedoni = calcola_hash_pedoni(pos)
+    pos.valutazione = calcola_valutazione(pos)
+    pos.pezzi = conta_pezzi(pos.board)
     
-    storico_mosse.clear()
-    turno = "w"
-    en_passant_target = None
-    w_king_moved = b_king_moved = False
-    w_rook_a_moved = w_rook_h_moved = False
-    b_rook_a_moved = b_rook_h_moved = False
+    # Pila di undo come al salvataggio (anche ripristinando in avanti):
+    # unmake_move e gli hash dello storico restano coerenti con la board
+    pos.storico = stato['storico'] + _array("Q", bytes(16*_PLY_INIZIALI))
+    pos.ply = stato['storico_len']
 
 
-def ottieni_storico_mosse():
-    """Ritorna copia dello storico mosse."""
-    return storico_mosse[:]
+def ottieni_storico_mosse(pos):
+    """Ritorna le mosse giocate (interi codificati), dalla prima all'ultima."""
+    return [pos.storico[2*i+1] & 0xFFFF for i in range(pos.ply)]
 
 
 def converti_mossa_notazione(start, end, board_before):
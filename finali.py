@@ -0,0 +1,596 @@
+# finali.py
+# ============================================================
+#  Tablebase dei finali con pochi pezzi (3 e 4, re compresi).
+#  Ogni finale (firma: 'KQK', 'KPK', 'KQKR', ... prima il lato
+#  piu' forte) e' generato con analisi retrograda: dai matti si
+#  risale con le mosse all'indietro, una semimossa alla volta.
+#  Catture e promozioni escono verso finali piu' piccoli, generati
+#  prima. Il file ha un byte per posizione, sonde via mmap:
+#    0 = patta, 1+n = matto in n semimosse (n dispari: vince chi
+#    muove, pari: perde), 255 = posizione illegale o non canonica
+#  Indice: casella del re bianco ridotta per simmetria (triangolo
+#  a1-d1-d4 senza pedoni, colonne a-d con pedoni), caselle degli
+#  altri pezzi, turno. En-passant, arrocco e regola delle 50 mosse
+#  sono ignorati (la sonda rifiuta le posizioni con en-passant o
+#  arrocco ancora possibili).
+#
+#  Uso:
+#    python finali.py genera                    # finali da 3 pezzi (secondi)
+#    python finali.py genera KQKR KBNK          # 4 pezzi: minuti ciascuno
+#    python finali.py sonda --fen "<fen>"
+# ============================================================
+import argparse
+import mmap
+import os
+import sys
+import time
+from itertools import product
+
+import chess_core as core
+
+PATTA, INDECISO, ILLEGALE = 0, 254, 255
+FINALI_3 = ("KQK", "KRK", "KPK")
+# Materiale con cui nessuno puo' dare matto: patta senza tabella
+_PATTE = {"KK", "KBK", "KNK"}
+_ORDINE = "QRBNP"                           # ordine dei pezzi nella firma
+
+
+# ---------- Geometria (casella = riga*8 + col, a8 = 0) ---------------------
+def _salti(delta):
+    return [{(r+dr)*8 + c+dc for dr, dc in delta if 0 <= r+dr < 8 and 0 <= c+dc < 8}
+            for r in range(8) for c in range(8)]
+
+
+def _raggi(direzioni):
+    raggi = []
+    for r in range(8):
+        for c in range(8):
+            casella = []
+            for dr, dc in direzioni:
+                raggio, rr, cc = [], r+dr, c+dc
+                while 0 <= rr < 8 and 0 <= cc < 8:
+                    raggio.append(rr*8 + cc)
+                    rr += dr; cc += dc
+                if raggio:
+                    casella.append(raggio)
+            raggi.append(casella)
+    return raggi
+
+
+_ORTOGONALI = ((1, 0), (-1, 0), (0, 1), (0, -1))
+_DIAGONALI = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+_RE = _salti(_ORTOGONALI + _DIAGONALI)
+_CAVALLO = _salti(((1, 2), (2, 1), (-1, 2), (-2, 1), (1, -2), (2, -1), (-1, -2), (-2, -1)))
+_RAGGI = {"R": _raggi(_ORTOGONALI), "B": _raggi(_DIAGONALI),
+          "Q": _raggi(_ORTOGONALI + _DIAGONALI)}
+_PEDONE_CATTURE = {"w": _salti(((-1, -1), (-1, 1))), "b": _salti(((1, -1), (1, 1)))}
+
+# _TRA[da*64 + a] = (ortogonale, caselle in mezzo) se allineate, altrimenti None
+_TRA = [None] * 4096
+for _da in range(64):
+    for _raggio in _RAGGI["Q"][_da]:
+        _orto = (_raggio[0] >> 3) == (_da >> 3) or (_raggio[0] & 7) == (_da & 7)
+        for _k, _a in enumerate(_raggio):
+            _TRA[_da*64 + _a] = (_orto, tuple(_raggio[:_k]))
+del _da, _raggio, _orto, _k, _a
+
+
+def _trasforma(t, sq):
+    """Una delle 8 simmetrie della scacchiera: bit 4 trasposta, 1 colonne, 2 righe."""
+    r, c = sq >> 3, sq & 7
+    if t & 4:
+        r, c = c, r
+    if t & 1:
+        c = 7 - c
+    if t & 2:
+        r = 7 - r
+    return r*8 + c
+
+
+_TRASF = [[_trasforma(t, sq) for sq in range(64)] for t in range(8)]
+_TRIANGOLO = [sq for sq in range(64) if (sq & 7) <= 3 and 7 - (sq >> 3) <= (sq & 7)]
+_COLONNE_AD = [sq for sq in range(64) if (sq & 7) <= 3]
+
+
+# ---------- Firme e indici -------------------------------------------------
+def _dividi(firma):
+    """'KQKR' -> ('KQ', 'KR'); ValueError se non e' una firma valida."""
+    i = firma.find("K", 1)
+    bianchi, neri = firma[:i], firma[i:]
+    if (i < 0 or not bianchi.startswith("K") or "K" in bianchi[1:] + neri[1:]
+            or any(p not in _ORDINE for p in bianchi[1:] + neri[1:])):
+        raise ValueError(f"Firma non valida: {firma!r}")
+    return bianchi, neri
+
+
+def _forza(lato):
+    return len(lato), sorted((-_ORDINE.index(p) for p in lato[1:]), reverse=True)
+
+
+def _firma(bianchi, neri):
+    """(firma normalizzata, colori scambiati): il lato piu' forte va per primo."""
+    bianchi = "K" + "".join(sorted(bianchi.replace("K", ""), key=_ORDINE.index))
+    neri = "K" + "".join(sorted(neri.replace("K", ""), key=_ORDINE.index))
+    if _forza(neri) > _forza(bianchi):
+        return neri + bianchi, True
+    return bianchi + neri, False
+
+
+class _Schema:
+    """Pezzi di un finale e corrispondenza posizione <-> indice nel file."""
+    __slots__ = ("firma", "pezzi", "re", "gruppi", "regione", "indice_regione",
+                 "trasf_re", "n")
+
+    def __init__(self, firma):
+        bianchi, neri = _dividi(firma)
+        self.firma = firma
+        self.pezzi = [("w", t) for t in bianchi] + [("b", t) for t in neri]
+        self.re = (0, len(bianchi))         # indice del re bianco / nero
+        # Pezzi uguali dello stesso colore: caselle in ordine crescente
+        self.gruppi = []
+        i = 0
+        while i < len(self.pezzi):
+            j = i
+            while j + 1 < len(self.pezzi) and self.pezzi[j + 1] == self.pezzi[i]:
+                j += 1
+            if j > i:
+                self.gruppi.append((i, j + 1))
+            i = j + 1
+        pedoni = "P" in firma
+        self.regione = _COLONNE_AD if pedoni else _TRIANGOLO
+        self.indice_regione = [-1] * 64
+        for i, sq in enumerate(self.regione):
+            self.indice_regione[sq] = i
+        # Con i pedoni vale solo lo specchio delle colonne
+        simmetrie = (0, 1) if pedoni else range(8)
+        self.trasf_re = [[t for t in simmetrie if self.indice_regione[_TRASF[t][sq]] >= 0]
+                         for sq in range(64)]
+        self.n = len(self.regione) * 64 ** (len(self.pezzi) - 1) * 2
+
+    def indice(self, s, turno):
+        """Indice canonico delle caselle s (ordine di self.pezzi), turno 0 bianco / 1 nero."""
+        migliore = None
+        for t in self.trasf_re[s[0]]:
+            tr = _TRASF[t]
+            q = [tr[x] for x in s]
+            for a, b in self.gruppi:
+                q[a:b] = sorted(q[a:b])
+            i = self.indice_regione[q[0]]
+            for x in q[1:]:
+                i = i*64 + x
+            i = i*2 + turno
+            if migliore is None or i < migliore:
+                migliore = i
+        return migliore
+
+    def decodifica(self, i):
+        turno = i & 1
+        i >>= 1
+        s = [0] * len(self.pezzi)
+        for k in range(len(s) - 1, 0, -1):
+            i, s[k] = divmod(i, 64)
+        s[0] = self.regione[i]
+        return s, turno
+
+
+_SCHEMI = {}
+
+
+def _schema(firma):
+    schema = _SCHEMI.get(firma)
+    if schema is None:
+        schema = _SCHEMI[firma] = _Schema(firma)
+    return schema
+
+
+def _esito(b):
+    """Byte del file -> (esito per chi muove: 1/0/-1, semimosse al matto)."""
+    if b == PATTA:
+        return 0, 0
+    n = b - 1
+    return (1 if n & 1 else -1), n
+
+
+# ---------- Sonde (mmap) ---------------------------------------------------
+class TabelleFinali:
+    """
+    Tablebase di una cartella di file '<firma>.dtm', aperti con mmap
+    alla prima sonda. max_pezzi e' il numero di pezzi del finale piu'
+    grande disponibile (0 se la cartella e' vuota o non esiste).
+    """
+
+    def __init__(self, cartella):
+        self.cartella = cartella
+        self._tabelle = {}                  # firma -> mmap, None se manca
+        self._file = []
+        firme = ([f[:-4] for f in os.listdir(cartella) if f.endswith(".dtm")]
+                 if os.path.isdir(cartella) else [])
+        self.max_pezzi = max((len(f) for f in firme), default=0)
+
+    def chiudi(self):
+        for tabella in self._tabelle.values():
+            if tabella is not None:
+                tabella.close()
+        for f in self._file:
+            f.close()
+        self._tabelle.clear()
+        self._file.clear()
+
+    def _tabella(self, firma):
+        if firma not in self._tabelle:
+            percorso = os.path.join(self.cartella, firma + ".dtm")
+            tabella = None
+            if os.path.exists(percorso):
+                f = open(percorso, "rb")
+                if os.fstat(f.fileno()).st_size != _schema(firma).n:
+                    f.close()
+                    raise ValueError(f"{percorso}: dimensione errata")
+                self._file.append(f)
+                tabella = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._tabelle[firma] = tabella
+        return self._tabelle[firma]
+
+    def valore(self, pezzi, turno):
+        """
+        (esito, semimosse al matto) per chi muove, con pezzi = [(colore,
+        tipo, casella), ...]; None se la tabella del finale manca.
+        """
+        bianchi = "".join(t for c, t, _ in pezzi if c == "w")
+        neri = "".join(t for c, t, _ in pezzi if c == "b")
+        firma, scambia = _firma(bianchi, neri)
+        if firma in _PATTE:
+            return 0, 0
+        tabella = self._tabella(firma)
+        if tabella is None:
+            return None
+        if scambia:                         # colori invertiti e scacchiera capovolta
+            pezzi = [("b" if c == "w" else "w", t, sq ^ 56) for c, t, sq in pezzi]
+            turno = "b" if turno == "w" else "w"
+        caselle = {}
+        for c, t, sq in pezzi:
+            caselle.setdefault(c + t, []).append(sq)
+        schema = _schema(firma)
+        s = [caselle[c + t].pop() for c, t in schema.pezzi]
+        return _esito(tabella[schema.indice(s, turno == "b")])
+
+    def sonda(self, pos):
+        """(esito, semimosse al matto) per chi muove, oppure None se non coperta."""
+        pezzi = []
+        for r, riga in enumerate(pos.board):
+            for c, p in enumerate(riga):
+                if p:
+                    pezzi.append((p[0], p[1], r*8 + c))
+        if len(pezzi) > self.max_pezzi or _arrocco_possibile(pos):
+            return None
+        ep = pos.en_passant_target
+        if ep:                              # cattura en-passant davvero disponibile?
+            r, c = ep
+            riga = pos.board[r + 1 if pos.turno == "w" else r - 1]
+            pedone = pos.turno + "P"
+            if (c > 0 and riga[c - 1] == pedone) or (c < 7 and riga[c + 1] == pedone):
+                return None
+        return self.valore(pezzi, pos.turno)
+
+    def mossa(self, pos):
+        """
+        Mossa perfetta: la vittoria piu' rapida, altrimenti una patta,
+        altrimenti la sconfitta piu' lenta. (mossa, esito, semimosse)
+        oppure None se la posizione (o un seguito) non e' coperta.
+        """
+        migliore = None
+        for m in core.genera_mosse_legali(pos):
+            core.make_move(pos, m)
+            v = self.sonda(pos)
+            core.unmake_move(pos)
+            if v is None:
+                return None
+            esito, n = -v[0], v[1] + 1
+            chiave = (esito, -n if esito > 0 else n if esito < 0 else 0)
+            if migliore is None or chiave > migliore[0]:
+                migliore = (chiave, m, esito, n if esito else 0)
+        return migliore[1:] if migliore else None
+
+
+def _arrocco_possibile(pos):
+    """Diritti di arrocco con re e torre ancora sulle case iniziali."""
+    if not pos.arrocco:
+        return False
+    board, diritti = pos.board, pos.arrocco
+    return ((board[7][4] == "wK" and (diritti & core.ARR_WK and board[7][7] == "wR"
+                                      or diritti & core.ARR_WQ and board[7][0] == "wR"))
+            or (board[0][4] == "bK" and (diritti & core.ARR_BK and board[0][7] == "bR"
+                                         or diritti & core.ARR_BQ and board[0][0] == "bR")))
+
+
+# ---------- Generazione (analisi retrograda) -------------------------------
+def _attaccata(q, colore, s, pezzi):
+    """True se la casella q e' attaccata dai pezzi di colore (caselle s, -1 = catturato)."""
+    for j, (c, t) in enumerate(pezzi):
+        da = s[j]
+        if c != colore or da < 0:
+            continue
+        if t == "K":
+            if q in _RE[da]:
+                return True
+        elif t == "N":
+            if q in _CAVALLO[da]:
+                return True
+        elif t == "P":
+            if q in _PEDONE_CATTURE[c][da]:
+                return True
+        else:
+            linea = _TRA[da*64 + q]
+            if (linea is not None and (t == "Q" or linea[0] == (t == "R"))
+                    and not any(x in s for x in linea[1])):
+                return True
+    return False
+
+
+def _mosse(s, pezzi, colore):
+    """Mosse pseudo-legali di colore: (pezzo, arrivo, pezzo catturato o -1)."""
+    occ = {sq: j for j, sq in enumerate(s)}
+    for j, (c, t) in enumerate(pezzi):
+        if c != colore:
+            continue
+        da = s[j]
+        if t == "P":
+            passo = -8 if c == "w" else 8
+            a = da + passo
+            if a not in occ:
+                yield j, a, -1
+                if (da >> 3) == (6 if c == "w" else 1) and a + passo not in occ:
+                    yield j, a + passo, -1
+            for a in _PEDONE_CATTURE[c][da]:
+                k = occ.get(a)
+                if k is not None and pezzi[k][0] != c:
+                    yield j, a, k
+        elif t == "K" or t == "N":
+            for a in (_RE if t == "K" else _CAVALLO)[da]:
+                k = occ.get(a)
+                if k is None:
+                    yield j, a, -1
+                elif pezzi[k][0] != c:
+                    yield j, a, k
+        else:
+            for raggio in _RAGGI[t][da]:
+                for a in raggio:
+                    k = occ.get(a)
+                    if k is None:
+                        yield j, a, -1
+                    else:
+                        if pezzi[k][0] != c:
+                            yield j, a, k
+                        break
+
+
+def _predecessori(schema, i):
+    """Indici canonici delle posizioni da cui una mossa senza cattura porta a i."""
+    s, turno = schema.decodifica(i)
+    pezzi = schema.pezzi
+    colore = "b" if turno == 0 else "w"     # chi ha appena mosso
+    re_fermo = schema.re[turno]             # il re di chi muove in i
+    risultato = set()
+    for j, (c, t) in enumerate(pezzi):
+        if c != colore:
+            continue
+        a = s[j]
+        if t == "P":
+            passo = 8 if c == "w" else -8   # all'indietro
+            da = a + passo
+            origini = []
+            if da not in s and 8 <= da < 56:
+                origini.append(da)
+                if (a >> 3) == (4 if c == "w" else 3) and da + passo not in s:
+                    origini.append(da + passo)
+        elif t == "K" or t == "N":
+            origini = [da for da in (_RE if t == "K" else _CAVALLO)[a] if da not in s]
+        else:
+            origini = []
+            for raggio in _RAGGI[t][a]:
+                for da in raggio:
+                    if da in s:
+                        break
+                    origini.append(da)
+        for da in origini:
+            p = s[:]
+            p[j] = da
+            # Prima della mossa il re avversario non poteva essere sotto scacco
+            if not _attaccata(p[re_fermo], colore, p, pezzi):
+                risultato.add(schema.indice(p, 1 - turno))
+    return risultato
+
+
+def _retrograda(schema, archivio, stampa=print):
+    """Valori (bytearray, un byte per indice) del finale; le uscite si sondano in archivio."""
+    pezzi = schema.pezzi
+    n = len(pezzi)
+    valori = bytearray([ILLEGALE]) * schema.n
+    contatori = bytearray(schema.n)         # figli (classi canoniche) non ancora vinti
+    uscite = bytearray(schema.n)            # bit 1: uscita patta, bit 2: uscita vincente
+    perdite = bytearray(schema.n)           # 1 + semimosse della sconfitta piu' lenta in uscita
+    attesa = {}                             # semimosse -> indici da decidere a quel livello
+    frontiera = []
+    pedoni = [j for j, (_, t) in enumerate(pezzi) if t == "P"]
+    t0 = time.perf_counter()
+
+    # 1) Ogni posizione: matto/stallo, figli nel finale, uscite verso finali piu' piccoli
+    base = -1
+    for combinazione in product(range(len(schema.regione)), *[range(64)] * (n - 1)):
+        base += 1
+        s = [schema.regione[combinazione[0]], *combinazione[1:]]
+        if (len(set(s)) != n or any(s[j] < 8 or s[j] >= 56 for j in pedoni)
+                or any(s[a:b] != sorted(s[a:b]) for a, b in schema.gruppi)
+                or len(schema.trasf_re[s[0]]) > 1 and schema.indice(s, 0) != base*2):
+            continue
+        for turno in (0, 1):
+            i = base*2 + turno
+            colore, nemico = ("w", "b") if turno == 0 else ("b", "w")
+            if _attaccata(s[schema.re[1 - turno]], colore, s, pezzi):
+                continue                    # re di chi non muove sotto scacco
+            mio_re = schema.re[turno]
+            figli = set()
+            legali = 0
+            vittoria = 0                    # semimosse della vittoria piu' rapida in uscita
+            patta = False
+            perdita = 0
+            for j, a, k in _mosse(s, pezzi, colore):
+                f = s[:]
+                f[j] = a
+                if k >= 0:
+                    f[k] = -1
+                if _attaccata(f[mio_re], nemico, f, pezzi):
+                    continue
+                legali += 1
+                promozione = pezzi[j][1] == "P" and (a < 8 or a >= 56)
+                if k < 0 and not promozione:
+                    figli.add(schema.indice(f, 1 - turno))
+                    continue
+                for nuovo in ("QRBN" if promozione else (pezzi[j][1],)):
+                    lista = [(pezzi[x][0], nuovo if x == j else pezzi[x][1], f[x])
+                             for x in range(n) if f[x] >= 0]
+                    v = archivio.valore(lista, nemico)
+                    if v is None:
+                        raise RuntimeError(f"{schema.firma}: manca la tablebase di un'uscita")
+                    esito, m = v
+                    if esito < 0:
+                        vittoria = m + 1 if not vittoria else min(vittoria, m + 1)
+                    elif esito == 0:
+                        patta = True
+                    else:
+                        perdita = max(perdita, m + 2)
+            if not legali:
+                if _attaccata(s[mio_re], nemico, s, pezzi):
+                    valori[i] = 1           # matto: perde in 0
+                    frontiera.append(i)
+                else:
+                    valori[i] = PATTA       # stallo
+                continue
+            valori[i] = INDECISO
+            contatori[i] = len(figli)
+            uscite[i] = patta | (2 if vittoria else 0)
+            perdite[i] = perdita
+            if vittoria:
+                attesa.setdefault(vittoria, []).append(i)
+            elif not figli:
+                if patta:
+                    valori[i] = PATTA
+                else:
+                    attesa.setdefault(perdita - 1, []).append(i)
+    stampa(f"  {schema.firma}: posizioni iniziali in {time.perf_counter() - t0:.1f}s")
+
+    # 2) Livello d: posizioni decise in d semimosse (d dispari: vince chi muove)
+    d = 0
+    while frontiera or attesa:
+        for i in attesa.pop(d, ()):
+            if valori[i] == INDECISO:
+                valori[i] = d + 1
+                frontiera.append(i)
+        if d + 2 >= INDECISO:
+            raise RuntimeError(f"{schema.firma}: matto oltre {INDECISO - 2} semimosse")
+        prossima = []
+        for i in frontiera:
+            for p in _predecessori(schema, i):
+                if valori[p] != INDECISO:
+                    continue
+                if not d & 1:               # i perde: chi ci arriva vince in d+1
+                    valori[p] = d + 2
+                    prossima.append(p)
+                elif not uscite[p] & 2:     # i vince: una via di scampo in meno
+                    contatori[p] -= 1
+                    if contatori[p]:
+                        continue
+                    if uscite[p] & 1:
+                        valori[p] = PATTA
+                    elif perdite[p] - 1 > d + 1:
+                        attesa.setdefault(perdite[p] - 1, []).append(p)
+                    else:
+                        valori[p] = d + 2
+                        prossima.append(p)
+        frontiera = prossima
+        d += 1
+
+    for i, v in enumerate(valori):
+        if v == INDECISO:
+            valori[i] = PATTA
+    stampa(f"  {schema.firma}: matto piu' lungo in {d - 1} semimosse, "
+           f"{time.perf_counter() - t0:.1f}s")
+    return valori
+
+
+def _dipendenze(firma):
+    """Finali raggiungibili con una cattura e/o una promozione."""
+    bianchi, neri = _dividi(firma)
+    risultato = set()
+    for lato, altro, scambia in ((bianchi, neri, False), (neri, bianchi, True)):
+        catture = [altro] + [altro.replace(p, "", 1) for p in set(altro[1:])]
+        promozioni = [lato] + ([lato.replace("P", q, 1) for q in "QRBN"] if "P" in lato else [])
+        for nuovo in promozioni:
+            for preso in catture:
+                if (nuovo, preso) != (lato, altro):
+                    risultato.add(_firma(*((preso, nuovo) if scambia else (nuovo, preso)))[0])
+    return sorted(risultato - _PATTE - {firma})
+
+
+def genera(firma, cartella="finali", stampa=print):
+    """
+    Genera '<cartella>/<firma>.dtm' (se manca) dopo i finali da cui
+    dipende. Ritorna il percorso, o None per i finali sempre patti.
+    """
+    firma = _firma(*_dividi(firma))[0]
+    if firma in _PATTE:
+        return None
+    percorso = os.path.join(cartella, firma + ".dtm")
+    if os.path.exists(percorso):
+        return percorso
+    for dipendenza in _dipendenze(firma):
+        genera(dipendenza, cartella, stampa)
+    os.makedirs(cartella, exist_ok=True)
+    stampa(f"Genero {firma} ({_schema(firma).n} posizioni)...")
+    archivio = TabelleFinali(cartella)
+    try:
+        valori = _retrograda(_schema(firma), archivio, stampa)
+    finally:
+        archivio.chiudi()
+    with open(percorso + ".tmp", "wb") as f:
+        f.write(valori)
+    os.replace(percorso + ".tmp", percorso)
+    return percorso
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tablebase dei finali con 3-4 pezzi")
+    comandi = parser.add_subparsers(dest="comando", required=True)
+    g = comandi.add_parser("genera", help="genera le tablebase (e quelle da cui dipendono)")
+    g.add_argument("firme", nargs="*", default=list(FINALI_3))
+    g.add_argument("-c", "--cartella", default="finali")
+    s = comandi.add_parser("sonda", help="valore e mossa migliore di una posizione")
+    s.add_argument("--fen", required=True)
+    s.add_argument("-c", "--cartella", default="finali")
+    args = parser.parse_args(argv)
+
+    if args.comando == "genera":
+        for firma in args.firme:
+            genera(firma.upper(), args.cartella)
+        return 0
+
+    pos = core.da_fen(args.fen)
+    tabelle = TabelleFinali(args.cartella)
+    t0 = time.perf_counter()
+    v = tabelle.sonda(pos)
+    risposta = tabelle.mossa(pos) if v else None
+    dt = time.perf_counter() - t0
+    if v is None:
+        print("Posizione non coperta dalle tablebase disponibili")
+        return 1
+    esito, n = v
+    print(("Patta" if not esito else
+           f"{'Vince' if esito > 0 else 'Perde'} chi muove: matto in {n} semimosse"))
+    if risposta:
+        print(f"Mossa migliore: {core.mossa_uci(risposta[0])}")
+    print(f"({dt * 1e3:.2f} ms)")
+    tabelle.chiudi()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
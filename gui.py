@@ -48,19 +48,18 @@ def inizializza_gui():
     return screen
 
 # ---------- Calcolo mosse legali -------
-def calcola_mosse_legali(board, pos, engine):
+def calcola_mosse_legali(posizione, pos, engine):
     """Ritorna tuple (libere, capture) di caselle legali dal pezzo selezionato."""
     libere, cap = [], []
+    board = posizione.board
     r0,c0 = pos
     if not board[r0][c0]:     # casella vuota
         return libere, cap
-    for r in range(8):
-        for c in range(8):
-            if engine.mossa_valida(board, pos, (r,c)):
-                if board[r][c]=="":
-                    libere.append((r,c))
-                else:
-                    cap.append((r,c))
+    for r,c in engine.mosse_legali_pezzo(posizione, pos):
+        if board[r][c]=="":
+            libere.append((r,c))
+        else:
+            cap.append((r,c))
     return libere, cap
 
 # ---------- Popup promozione -----------
@@ -385,6 +384,24 @@ def anim_message(screen, msg, color=(200,30,30), durata=1500):
         pygame.time.delay(30)
 
 
+# ---------- Indicatore ricerca del bot -----------
+def disegna_pensiero_bot(screen, profondita, nodi, secondi, y_offset=585):
+    """Riquadro "il bot sta pensando" con profondità completata, nodi e tempo."""
+    font = pygame.font.Font("Font/DejaVuSans.ttf", 16)
+    font_tiny = pygame.font.Font("Font/DejaVuSans.ttf", 14)
+    rect = pygame.Rect(BOARD + 50, y_offset, SIDE_W - 60, 82)
+    pygame.draw.rect(screen, (230, 236, 250), rect, border_radius=6)
+    pygame.draw.rect(screen, (90, 110, 160), rect, 2, border_radius=6)
+
+    # Puntini animati: la finestra resta viva durante la ricerca
+    puntini = "." * (1 + pygame.time.get_ticks() // 400 % 3)
+    titolo = font.render(f"Il bot pensa{puntini}", True, (40, 60, 120))
+    screen.blit(titolo, (rect.x + 10, rect.y + 8))
+    righe = (f"Profondità {profondita}  ·  {secondi:.1f}s", f"{nodi:,} nodi".replace(",", "."))
+    for i, riga in enumerate(righe):
+        screen.blit(font_tiny.render(riga, True, (80, 80, 80)), (rect.x + 10, rect.y + 34 + i * 20))
+
+
 # ============================================================
 # INTERFACCIA REPLAY MOSSE
 # ============================================================
@@ -0,0 +1,318 @@
+# libro.py
+# ============================================================
+#  Libro d'aperture su disco per il bot.
+#  Il file e' una sequenza di record a larghezza fissa (12 byte,
+#  big-endian) ordinati per chiave:
+#    chiave Zobrist (64 bit) | mossa (16 bit) | peso (16 bit)
+#  La chiave e' Position.hash di chess_core (seme fisso), la mossa
+#  e' la mossa intera di chess_core. Il file viene aperto con mmap
+#  e cercato per bisezione: nessun caricamento in memoria.
+#  Il libro si costruisce leggendo in streaming collezioni PGN.
+#
+#  Uso:
+#    python libro.py costruisci partite.pgn [altre.pgn ...] -o libro.bin
+#    python libro.py costruisci partite.pgn --ply 24 --min-partite 3
+#    python libro.py sonda [--fen "<fen>"] [-l libro.bin]
+# ============================================================
+import argparse
+import mmap
+import os
+import random
+import re
+import struct
+import sys
+import time
+
+import chess_core as core
+
+_RECORD = struct.Struct(">QHH")             # chiave, mossa, peso
+DIMENSIONE_RECORD = _RECORD.size            # 12 byte
+PESO_MAX = 0xFFFF
+
+# Peso della mossa per chi l'ha giocata: vittoria, patta, sconfitta.
+# Le partite senza risultato ('*') contano come patte.
+_PUNTI = {"1-0": (2, 0), "0-1": (0, 2), "1/2-1/2": (1, 1), "*": (1, 1)}
+
+
+# ---------- Lettura (mmap + bisezione) -------------------------------------
+class LibroAperture:
+    """
+    Libro aperto in sola lettura con mmap. Una sonda costa una ricerca
+    binaria sul file (log2 N letture di 8 byte) piu' la lettura delle
+    voci della posizione: pochi microsecondi anche con milioni di record.
+    """
+    __slots__ = ("percorso", "n", "_file", "_mappa")
+
+    def __init__(self, percorso):
+        self.percorso = percorso
+        self._file = open(percorso, "rb")
+        dimensione = os.fstat(self._file.fileno()).st_size
+        if dimensione % DIMENSIONE_RECORD:
+            self._file.close()
+            raise ValueError(f"{percorso}: dimensione non multipla di {DIMENSIONE_RECORD} byte")
+        self.n = dimensione // DIMENSIONE_RECORD
+        # mmap non accetta file vuoti: un libro vuoto non trova mai nulla
+        self._mappa = (mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                       if dimensione else b"")
+
+    def chiudi(self):
+        if isinstance(self._mappa, mmap.mmap):
+            self._mappa.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.chiudi()
+
+    def __len__(self):
+        return self.n
+
+    def voci(self, chiave):
+        """[(mossa, peso), ...] salvati per la chiave, in ordine di peso decrescente."""
+        m = self._mappa
+        lo, hi = 0, self.n
+        while lo < hi:                      # primo record con chiave >= cercata
+            mezzo = (lo + hi) >> 1
+            i = mezzo * DIMENSIONE_RECORD
+            if int.from_bytes(m[i:i+8], "big") < chiave:
+                lo = mezzo + 1
+            else:
+                hi = mezzo
+        risultato = []
+        while lo < self.n:
+            k, mossa, peso = _RECORD.unpack_from(m, lo * DIMENSIONE_RECORD)
+            if k != chiave:
+                break
+            risultato.append((mossa, peso))
+            lo += 1
+        return risultato
+
+    def mosse(self, pos):
+        """Voci della posizione ristrette alle mosse legali (scarta le collisioni di chiave)."""
+        voci = self.voci(pos.hash)
+        if not voci:
+            return []
+        legali = set(core.genera_mosse_legali(pos))
+        return [(m, p) for m, p in voci if p and m in legali]
+
+    def mossa(self, pos, casuale=True, rng=random):
+        """
+        Mossa del libro per la posizione (0 se assente): estratta in
+        proporzione al peso, oppure quella di peso massimo.
+        """
+        voci = [v for v in self.voci(pos.hash) if v[1]]
+        # Si verifica solo la mossa estratta: una collisione di chiave la
+        # scarta e si riprova con le altre
+        while voci:
+            i = (rng.choices(range(len(voci)), weights=[p for _, p in voci])[0]
+                 if casuale else 0)
+            if _legale(pos, voci[i][0]):
+                return voci[i][0]
+            del voci[i]
+        return 0
+
+
+def _legale(pos, m):
+    """Verifica della sola mossa del libro, senza generare tutte le mosse."""
+    start, end = core.caselle_mossa(m)
+    pezzo = pos.board[start[0]][start[1]]
+    return (pezzo[:1] == pos.turno
+            and core.codifica_mossa(pos, start, end, core.pezzo_promozione(m)) == m
+            and core.mossa_valida(pos, start, end))
+
+
+# ---------- SAN -> mossa ---------------------------------------------------
+_SAN = re.compile(r"([NBRQK])?([a-h])?([1-8])?x?([a-h])([1-8])(?:=?([NBRQ]))?")
+
+
+def san_a_mossa(pos, san, legali=None):
+    """
+    Notazione algebrica standard ('Nbd7', 'exd5', 'e8=Q+', 'O-O')
+    -> mossa intera legale nella posizione. ValueError se non valida
+    o ambigua.
+    """
+    testo = san.rstrip("+#!?")
+    if legali is None:
+        legali = core.genera_mosse_legali(pos)
+    if testo in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        colonna = 6 if len(testo) == 3 else 2
+        candidate = [m for m in legali
+                     if m >> 14 == core.FLAG_ARROCCO and (m >> 6 & 7) == colonna]
+    else:
+        g = _SAN.fullmatch(testo)
+        if not g:
+            raise ValueError(f"SAN non valida: {san!r}")
+        tipo, col, riga, col_a, riga_a, promo = g.groups()
+        tipo = tipo or "P"
+        a = (8 - int(riga_a)) * 8 + "abcdefgh".index(col_a)
+        board = pos.board
+        candidate = []
+        for m in legali:
+            da = m & 63
+            if ((m >> 6 & 63) != a or board[da >> 3][da & 7][1] != tipo
+                    or col and (da & 7) != "abcdefgh".index(col)
+                    or riga and (da >> 3) != 8 - int(riga)):
+                continue
+            # Promozione senza pezzo indicato: donna
+            if core.pezzo_promozione(m) not in (promo, promo or "Q"):
+                continue
+            candidate.append(m)
+    if len(candidate) != 1:
+        raise ValueError(f"SAN {'ambigua' if candidate else 'illegale'}: {san!r}")
+    return candidate[0]
+
+
+# ---------- PGN in streaming -----------------------------------------------
+_RISULTATI = set(_PUNTI)
+_NUMERO = re.compile(r"\d+\.+")             # '12.' e '12...' (anche attaccati alla mossa)
+
+
+def leggi_pgn(righe):
+    """
+    Partite di un file PGN letto riga per riga: genera (risultato, [SAN, ...])
+    con le sole mosse della linea principale. Commenti {..} e ';', varianti
+    (..) annidate, NAG ($n) e numeri di mossa sono ignorati; il file non
+    viene mai caricato per intero.
+    """
+    risultato, mosse = "*", []
+    commento = False
+    varianti = 0
+    in_mosse = False
+    for riga in righe:
+        if not commento and riga.startswith("["):
+            if in_mosse:                    # partita senza risultato finale
+                yield risultato, mosse
+                risultato, mosse, in_mosse, varianti = "*", [], False, 0
+            if riga.startswith("[Result "):
+                valore = riga.split('"')[1] if '"' in riga else "*"
+                risultato = valore if valore in _RISULTATI else "*"
+            continue
+        if riga.startswith("%"):            # riga di escape del formato
+            continue
+        i, n = 0, len(riga)
+        while i < n:
+            ch = riga[i]
+            if commento:
+                j = riga.find("}", i)
+                if j < 0:
+                    break
+                commento = False
+                i = j + 1
+                continue
+            if ch == "{":
+                commento = True
+                i += 1
+                continue
+            if ch == ";":
+                break
+            if ch == "(":
+                varianti += 1
+                i += 1
+                continue
+            if ch == ")":
+                varianti = max(0, varianti - 1)
+                i += 1
+                continue
+            if ch.isspace():
+                i += 1
+                continue
+            j = i
+            while j < n and not riga[j].isspace() and riga[j] not in "{}();":
+                j += 1
+            token = riga[i:j]
+            i = j
+            if varianti:
+                continue
+            if token in _RISULTATI:
+                if mosse or in_mosse:
+                    yield token, mosse
+                risultato, mosse, in_mosse = "*", [], False
+                continue
+            token = _NUMERO.sub("", token, count=1) if token[0].isdigit() else token
+            if token and token[0] != "$":
+                mosse.append(token)
+                in_mosse = True
+    if in_mosse:
+        yield risultato, mosse
+
+
+# ---------- Costruzione ----------------------------------------------------
+def costruisci(percorsi_pgn, uscita, ply_max=20, min_partite=1, stampa=print):
+    """
+    Costruisce il libro dalle prime ply_max semimosse di ogni partita.
+    Il peso di una mossa somma i punti (2 vittoria, 1 patta) ottenuti da
+    chi l'ha giocata; restano le mosse viste in almeno min_partite partite
+    e con peso non nullo. Ritorna il numero di record scritti.
+    """
+    statistiche = {}                        # (chiave, mossa) -> [peso, partite]
+    partite = scartate = 0
+    t0 = time.perf_counter()
+    for percorso in percorsi_pgn:
+        with open(percorso, encoding="utf-8", errors="replace") as f:
+            for risultato, mosse in leggi_pgn(f):
+                partite += 1
+                punti = _PUNTI[risultato]
+                pos = core.Position()
+                try:
+                    for ply, san in enumerate(mosse[:ply_max]):
+                        m = san_a_mossa(pos, san)
+                        voce = statistiche.get((pos.hash, m))
+                        if voce is None:
+                            voce = statistiche[pos.hash, m] = [0, 0]
+                        voce[0] += punti[ply & 1]
+                        voce[1] += 1
+                        core.make_move(pos, m)
+                except ValueError:
+                    scartate += 1           # le mosse gia' lette restano valide
+                if partite % 10000 == 0:
+                    stampa(f"  {partite} partite, {len(statistiche)} mosse distinte "
+                           f"({time.perf_counter() - t0:.1f}s)")
+
+    record = [(k, -peso, m) for (k, m), (peso, n) in statistiche.items()
+              if peso and n >= min_partite]
+    # I pesi devono stare in 16 bit: si riscala tutto in proporzione
+    massimo = max((-p for _, p, _ in record), default=0)
+    if massimo > PESO_MAX:
+        record = [(k, -max(1, -p * PESO_MAX // massimo), m) for k, p, m in record]
+    record.sort()
+    with open(uscita, "wb") as f:
+        f.write(b"".join(_RECORD.pack(k, m, -p) for k, p, m in record))
+    stampa(f"Libro {uscita}: {len(record)} record da {partite} partite "
+           f"({scartate} con mosse non valide) in {time.perf_counter() - t0:.1f}s")
+    return len(record)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Libro d'aperture del bot")
+    comandi = parser.add_subparsers(dest="comando", required=True)
+    c = comandi.add_parser("costruisci", help="costruisce il libro da file PGN")
+    c.add_argument("pgn", nargs="+")
+    c.add_argument("-o", "--uscita", default="libro.bin")
+    c.add_argument("--ply", type=int, default=20, help="semimosse lette da ogni partita")
+    c.add_argument("--min-partite", type=int, default=1,
+                   help="partite minime perche' una mossa entri nel libro")
+    s = comandi.add_parser("sonda", help="mosse del libro per una posizione")
+    s.add_argument("-l", "--libro", default="libro.bin")
+    s.add_argument("--fen", default="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+    args = parser.parse_args(argv)
+
+    if args.comando == "costruisci":
+        costruisci(args.pgn, args.uscita, args.ply, args.min_partite)
+        return 0
+
+    pos = core.da_fen(args.fen)
+    with LibroAperture(args.libro) as libro:
+        t0 = time.perf_counter()
+        voci = libro.mosse(pos)
+        dt = time.perf_counter() - t0
+        totale = sum(p for _, p in voci) or 1
+        for m, p in voci:
+            print(f"  {core.mossa_uci(m):6} peso {p:5d}  {100 * p / totale:5.1f}%")
+        print(f"{len(voci)} mosse su {len(libro)} record ({dt * 1e6:.0f} µs)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -237,9 +237,12 @@ def ricostruisci_cimiteri(storia):
     return cem_w, cem_b
 
 
-def calcola_valutazione_rapida(board, colore_turno):
-    """Calcola velocemente la valutazione della posizione usando il bot."""
-    return bot.valuta_posizione(board, "w")
+def calcola_valutazione_rapida(partita):
+    """
+    Valutazione dal punto di vista del bianco, la stessa del bot: materiale
+    e tabelle tenuti da chess_core, struttura pedonale dalla cache del bot.
+    """
+    return partita.valutazione + bot.struttura_pedoni(partita)
 
 
 def main():
@@ -261,16 +264,18 @@ def main():
     posizione_replay = 0
     
     # === STATO CORRENTE ===
-    scacchiera = chess_core.crea_scacchiera()
-    chess_core.reset_completo()
+    partita = chess_core.Position()
+    scacchiera = partita.board
     selected = None
     cem_white, cem_black = [], []
     hint_free = hint_cap = None
     valutazione_corrente = 0
+    ricerca_bot = None          # RicercaInBackground mentre il bot pensa
+    inizio_bot = 0
+    ponder = None               # bot.Ponder durante il turno del giocatore
     
     # Salva stato iniziale
-    board_iniziale = copy.deepcopy(scacchiera)
-    stato_iniziale = chess_core.salva_stato_completo()
+    stato_iniziale = chess_core.salva_stato_completo(partita)
 
     running = True
     while running:
@@ -285,8 +290,8 @@ def main():
                     
                     if buttons["start"].collidepoint(event.pos):
                         posizione_replay = 0
-                        scacchiera = copy.deepcopy(board_iniziale)
-                        chess_core.ripristina_stato_completo(stato_iniziale)
+                        chess_core.ripristina_stato_completo(partita, stato_iniziale)
+                        scacchiera = partita.board
                         cem_white, cem_black = [], []
                         valutazione_corrente = 0
                         replay_mode = True
@@ -294,35 +299,35 @@ def main():
                     elif buttons["prev"].collidepoint(event.pos) and posizione_replay > 0:
                         posizione_replay -= 1
                         if posizione_replay == 0:
-                            scacchiera = copy.deepcopy(board_iniziale)
-                            chess_core.ripristina_stato_completo(stato_iniziale)
+                            chess_core.ripristina_stato_completo(partita, stato_iniziale)
+                            scacchiera = partita.board
                             cem_white, cem_black = [], []
                             valutazione_corrente = 0
                         else:
-                            _, scacchiera, stato = storia_partita[posizione_replay - 1]
-                            scacchiera = copy.deepcopy(scacchiera)
-                            chess_core.ripristina_stato_completo(stato)
+                            _, _, stato = storia_partita[posizione_replay - 1]
+                            chess_core.ripristina_stato_completo(partita, stato)
+                            scacchiera = partita.board
                             cem_white, cem_black = ricostruisci_cimiteri(storia_partita[:posizione_replay])
-                            valutazione_corrente = calcola_valutazione_rapida(scacchiera, chess_core.turno)
+                            valutazione_corrente = calcola_valutazione_rapida(partita)
                         replay_mode = True
                         
                     elif buttons["next"].collidepoint(event.pos) and posizione_replay < len(storia_partita):
-                        _, scacchiera, stato = storia_partita[posizione_replay]
-                        scacchiera = copy.deepcopy(scacchiera)
-                        chess_core.ripristina_stato_completo(stato)
+                        _, _, stato = storia_partita[posizione_replay]
+                        chess_core.ripristina_stato_completo(partita, stato)
+                        scacchiera = partita.board
                         posizione_replay += 1
                         cem_white, cem_black = ricostruisci_cimiteri(storia_partita[:posizione_replay])
-                        valutazione_corrente = calcola_valutazione_rapida(scacchiera, chess_core.turno)
+                        valutazione_corrente = calcola_valutazione_rapida(partita)
                         replay_mode = True
                         
                     elif buttons["end"].collidepoint(event.pos):
                         if storia_partita:
                             posizione_replay = len(storia_partita)
-                            _, scacchiera, stato = storia_partita[-1]
-                            scacchiera = copy.deepcopy(scacchiera)
-                            chess_core.ripristina_stato_completo(stato)
+                            _, _, stato = storia_partita[-1]
+                            chess_core.ripristina_stato_completo(partita, stato)
+                            scacchiera = partita.board
                             cem_white, cem_black = ricostruisci_cimiteri(storia_partita)
-                            valutazione_corrente = calcola_valutazione_rapida(scacchiera, chess_core.turno)
+                            valutazione_corrente = calcola_valutazione_rapida(partita)
                         replay_mode = True
                         
                     elif buttons["resume"].collidepoint(event.pos):
@@ -334,8 +339,8 @@ def main():
                         hint_free = hint_cap = None
                         
                     elif buttons["new"].collidepoint(event.pos):
-                        scacchiera = chess_core.crea_scacchiera()
-                        chess_core.reset_completo()
+                        partita = chess_core.Position()
+                        scacchiera = partita.board
                         storia_partita = []
                         posizione_replay = 0
                         cem_white, cem_black = [], []
@@ -344,28 +349,37 @@ def main():
                         partita_attiva = True
                         replay_mode = False
                         valutazione_corrente = 0
-                        board_iniziale = copy.deepcopy(scacchiera)
-                        stato_iniziale = chess_core.salva_stato_completo()
+                        stato_iniziale = chess_core.salva_stato_completo(partita)
 
             # === GIOCO NORMALE ===
             if partita_attiva and not replay_mode:
-                if event.type == pygame.MOUSEBUTTONDOWN:
+                # Mentre il bot pensa la scacchiera non accetta mosse
+                if event.type == pygame.MOUSEBUTTONDOWN and ricerca_bot is None:
                     r, c = gui.ottieni_posizione_click()
                     if r is None:
                         continue
-                        
                     if selected is None:
                         pezzo = scacchiera[r][c]
-                        if pezzo and pezzo[0]==chess_core.turno:
+                        if pezzo and pezzo[0]==partita.turno:
                             selected = (r, c)
-                            hint_free, hint_cap = gui.calcola_mosse_legali(scacchiera, selected, chess_core)
+                            hint_free, hint_cap = gui.calcola_mosse_legali(partita, selected, chess_core)
                     else:
                         dest = scacchiera[r][c]
                         board_before = copy.deepcopy(scacchiera)
                         
-                        if chess_core.esegui_mossa(scacchiera, selected, (r, c)):
+                        # Promozione: il pezzo si sceglie prima di eseguire la mossa
+                        promozione = "Q"
+                        if (chess_core.e_promozione(partita, selected, (r, c))
+                                and chess_core.mossa_valida(partita, selected, (r, c))):
+                            promozione = gui.chiedi_promozione(screen, partita.turno)[1]
+                        
+                        if chess_core.esegui_mossa(partita, selected, (r, c), promozione):
+                            # Mossa giocata: il ponder si ferma (il lavoro resta in tabella)
+                            if ponder is not None:
+                                ponder.annulla()
+                            
                             # Calcola valutazione
-                            valutazione_corrente = calcola_valutazione_rapida(scacchiera, chess_core.turno)
+                            valutazione_corrente = calcola_valutazione_rapida(partita)
                             
                             # Animazione
                             gui.anima_mossa(screen, scacchiera, selected, (r, c), 
@@ -376,17 +390,10 @@ def main():
                             if dest:
                                 (cem_black if dest[0]=="b" else cem_white).append(gui.PEZZI_UNICODE[dest])
                             
-                            # Promozione
-                            p = scacchiera[r][c]
-                            if p[1]=="P" and ((p[0]=="w" and r==0) or (p[0]=="b" and r==7)):
-                                nuovo = gui.chiedi_promozione(screen, p[0])
-                                scacchiera[r][c] = nuovo
-                                valutazione_corrente = calcola_valutazione_rapida(scacchiera, chess_core.turno)
-                            
                             # Salva nella storia
                             notazione = chess_core.converti_mossa_notazione(selected, (r, c), board_before)
                             board_after = copy.deepcopy(scacchiera)
-                            stato_after = chess_core.salva_stato_completo()
+                            stato_after = chess_core.salva_stato_completo(partita)
                             storia_partita.append((notazione, board_after, stato_after))
                             posizione_replay = len(storia_partita)
                             
@@ -394,11 +401,11 @@ def main():
                             hint_free = hint_cap = None
 
                             # Verifica stato
-                            esito = chess_core.stato_partita(scacchiera, chess_core.turno)
+                            esito = chess_core.stato_partita(partita)
                             if esito == "check":
                                 gui.anim_message(screen, "SCACCO!", (255, 100, 100), 1000)
                             elif esito == "checkmate":
-                                vincitore = "w" if chess_core.turno == "b" else "b"
+                                vincitore = "w" if partita.turno == "b" else "b"
                                 valutazione_corrente = 10000 if vincitore == "w" else -10000
                                 gui.mostra_schermata_fine_partita(screen, "checkmate", vincitore)
                                 partita_attiva = False
@@ -409,81 +416,45 @@ def main():
                                 partita_attiva = False
                                 replay_mode = True
      
-                            # BOT
-                            if partita_attiva and modalita in ("PvE", "PvE_UNDO") and chess_core.turno == "b":
-                                pygame.time.delay(bot_delay)
-                                
-                                mossa_bot = bot.scegli_mossa_bot(scacchiera, "b", config)
-                                    
-                                if mossa_bot:
-                                    partenza_bot, arrivo_bot = mossa_bot
-                                    r0, c0 = partenza_bot
-                                    r1, c1 = arrivo_bot
-                                    captured_bot = scacchiera[r1][c1]
-                                    
-                                    board_before_bot = copy.deepcopy(scacchiera)
-                                    
-                                    chess_core.esegui_mossa(scacchiera, partenza_bot, arrivo_bot)
-                                    
-                                    # Calcola valutazione
-                                    valutazione_corrente = calcola_valutazione_rapida(scacchiera, chess_core.turno)
-                                    
-                                    # Animazione bot
-                                    gui.anima_mossa(screen, scacchiera, partenza_bot, arrivo_bot,
-                                                   durata_ms=450, cem_white=cem_white, cem_black=cem_black,
-                                                   valutazione=valutazione_corrente)
-
-                                    # Cimitero bot
-                                    if captured_bot:
-                                        (cem_white if captured_bot[0]=="w" else cem_black).append(gui.PEZZI_UNICODE[captured_bot])
-
-                                    # Promozione bot
-                                    p = scacchiera[r1][c1]
-                                    if p[1]=="P" and ((p[0]=="w" and r1==0) or (p[0]=="b" and r1==7)):
-                                        scacchiera[r1][c1] = p[0] + "Q"
-                                        valutazione_corrente = calcola_valutazione_rapida(scacchiera, chess_core.turno)
-                                    
-                                    # Salva nella storia
-                                    notazione = chess_core.converti_mossa_notazione(partenza_bot, arrivo_bot, board_before_bot)
-                                    board_after_bot = copy.deepcopy(scacchiera)
-                                    stato_after_bot = chess_core.salva_stato_completo()
-                                    storia_partita.append((notazione, board_after_bot, stato_after_bot))
-                                    posizione_replay = len(storia_partita)
-
-                                    # Stato partita dopo bot
-                                    esito = chess_core.stato_partita(scacchiera, chess_core.turno)
-                                    if esito == "check":
-                                        gui.anim_message(screen, "SCACCO!", (255, 100, 100), 1000)
-                                    elif esito == "checkmate":
-                                        vincitore = "w" if chess_core.turno == "b" else "b"
-                                        valutazione_corrente = 10000 if vincitore == "w" else -10000
-                                        gui.mostra_schermata_fine_partita(screen, "checkmate", vincitore)
-                                        partita_attiva = False
-                                        replay_mode = True
-                                    elif esito == "stalemate":
-                                        valutazione_corrente = 0
-                                        gui.mostra_schermata_fine_partita(screen, "stalemate")
-                                        partita_attiva = False
-                                        replay_mode = True
+                            # BOT: la ricerca parte in background, la mossa arriva in un frame successivo
+                            if partita_attiva and modalita in ("PvE", "PvE_UNDO") and partita.turno == "b":
+                                if ponder is not None:
+                                    ricerca_bot = ponder.dopo_mossa(partita, chess_core.ultima_mossa(partita), config)
+                                else:
+                                    ricerca_bot = bot.RicercaInBackground(partita, "b", config)
+                                inizio_bot = pygame.time.get_ticks()
+                            if ponder is not None:
+                                ponder.annulla()
+                                ponder = None
                         else:
                             selected = None
                             hint_free = hint_cap = None
 
-                # Undo (solo PvE_UNDO)
+                # Undo (solo PvE_UNDO): se il bot sta pensando si annulla
+                # la ricerca e solo la mossa del giocatore
                 if event.type == pygame.KEYDOWN and modalita == "PvE_UNDO":
-                    if event.key == pygame.K_z and len(storia_partita) >= 2:
-                        storia_partita.pop()
-                        storia_partita.pop()
+                    da_annullare = 1 if ricerca_bot is not None else 2
+                    if event.key == pygame.K_z and len(storia_partita) >= da_annullare:
+                        # Le ricerche annullate finiscono prima di toccare la posizione
+                        if ricerca_bot is not None:
+                            ricerca_bot.annulla()
+                            ricerca_bot.attendi()
+                            ricerca_bot = None
+                        if ponder is not None:
+                            ponder.annulla()
+                            ponder.attendi()
+                            ponder = None
+                        del storia_partita[-da_annullare:]
                         
                         if storia_partita:
-                            _, scacchiera, stato = storia_partita[-1]
-                            scacchiera = copy.deepcopy(scacchiera)
-                            chess_core.ripristina_stato_completo(stato)
+                            _, _, stato = storia_partita[-1]
+                            chess_core.ripristina_stato_completo(partita, stato)
+                            scacchiera = partita.board
                             cem_white, cem_black = ricostruisci_cimiteri(storia_partita)
-                            valutazione_corrente = calcola_valutazione_rapida(scacchiera, chess_core.turno)
+                            valutazione_corrente = calcola_valutazione_rapida(partita)
                         else:
-                            scacchiera = copy.deepcopy(board_iniziale)
-                            chess_core.ripristina_stato_completo(stato_iniziale)
+                            chess_core.ripristina_stato_completo(partita, stato_iniziale)
+                            scacchiera = partita.board
                             cem_white, cem_black = [], []
                             valutazione_corrente = 0
                         
@@ -491,11 +462,68 @@ def main():
                         selected = None
                         hint_free = hint_cap = None
 
+        # === MOSSA DEL BOT (ricerca in background) ===
+        # bot_delay_ms e' il tempo minimo di risposta: la ricerca ne fa parte
+        if (ricerca_bot is not None and ricerca_bot.pronta()
+                and pygame.time.get_ticks() - inizio_bot >= bot_delay):
+            risultato_bot = ricerca_bot.esito()
+            ricerca_bot = None
+            mossa_bot = risultato_bot[0] if risultato_bot else None
+            if mossa_bot is not None:
+                partenza_bot, arrivo_bot = chess_core.caselle_mossa(mossa_bot)
+                r0, c0 = partenza_bot
+                r1, c1 = arrivo_bot
+                captured_bot = scacchiera[r1][c1]
+                
+                board_before_bot = copy.deepcopy(scacchiera)
+                
+                chess_core.esegui_mossa(partita, partenza_bot, arrivo_bot,
+                                        chess_core.pezzo_promozione(mossa_bot))
+                
+                # Calcola valutazione
+                valutazione_corrente = calcola_valutazione_rapida(partita)
+                
+                # Animazione bot
+                gui.anima_mossa(screen, scacchiera, partenza_bot, arrivo_bot,
+                               durata_ms=450, cem_white=cem_white, cem_black=cem_black,
+                               valutazione=valutazione_corrente)
+
+                # Cimitero bot
+                if captured_bot:
+                    (cem_white if captured_bot[0]=="w" else cem_black).append(gui.PEZZI_UNICODE[captured_bot])
+
+                # Salva nella storia
+                notazione = chess_core.converti_mossa_notazione(partenza_bot, arrivo_bot, board_before_bot)
+                board_after_bot = copy.deepcopy(scacchiera)
+                stato_after_bot = chess_core.salva_stato_completo(partita)
+                storia_partita.append((notazione, board_after_bot, stato_after_bot))
+                posizione_replay = len(storia_partita)
+
+                # Stato partita dopo bot
+                esito = chess_core.stato_partita(partita)
+                if esito == "check":
+                    gui.anim_message(screen, "SCACCO!", (255, 100, 100), 1000)
+                elif esito == "checkmate":
+                    vincitore = "w" if partita.turno == "b" else "b"
+                    valutazione_corrente = 10000 if vincitore == "w" else -10000
+                    gui.mostra_schermata_fine_partita(screen, "checkmate", vincitore)
+                    partita_attiva = False
+                    replay_mode = True
+                elif esito == "stalemate":
+                    valutazione_corrente = 0
+                    gui.mostra_schermata_fine_partita(screen, "stalemate")
+                    partita_attiva = False
+                    replay_mode = True
+
+                # Pondering: il bot continua a cercare mentre il giocatore pensa
+                if partita_attiva and config.get("bot_ponder", False):
+                    ponder = bot.Ponder(partita, "b", risultato_bot[2], config)
+
         # === AGGIORNA TITOLO ===
         if replay_mode:
             pygame.display.set_caption(f"Scacchi Facili – REPLAY (Mossa {posizione_replay}/{len(storia_partita)})")
         else:
-            pygame.display.set_caption(f"Scacchi Facili – Turno: {'Bianco' if chess_core.turno == 'w' else 'Nero'}")
+            pygame.display.set_caption(f"Scacchi Facili – Turno: {'Bianco' if partita.turno == 'w' else 'Nero'}")
 
         # === DISEGNO ===
         gui.disegna_scacchiera(screen, scacchiera,
@@ -508,6 +536,11 @@ def main():
         if storia_partita:
             gui.disegna_storia_mosse(screen, storia_partita, posizione_replay - 1)
         
+        # Indicatore ricerca del bot
+        if ricerca_bot is not None:
+            gui.disegna_pensiero_bot(screen, ricerca_bot.profondita, ricerca_bot.nodi,
+                                     ricerca_bot.secondi)
+        
         # Controlli replay
         if not partita_attiva or replay_mode:
             gui.disegna_controlli_replay(screen)
@@ -515,6 +548,13 @@ def main():
         pygame.display.flip()
         clock.tick(60)
 
+    if ricerca_bot is not None:
+        ricerca_bot.annulla()
+        ricerca_bot.attendi()
+    if ponder is not None:
+        ponder.annulla()
+        ponder.attendi()
+    bot.chiudi_pool()
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,133 @@
+# perft.py
+# ============================================================
+#  Perft / divide e benchmark del generatore di mosse.
+#  Confronta i conteggi con valori noti e misura i nodi/secondo
+#  del generatore di chess_core.
+#
+#  Uso:
+#    python perft.py                        # suite, profondita' <= 4
+#    python perft.py --profondita 6         # suite completa (lenta)
+#    python perft.py --divide 3 --fen "<fen>"
+# ============================================================
+import argparse
+import sys
+import time
+
+import chess_core as core
+
+# (nome, FEN, nodi attesi per profondita' 1..n)
+# Valori di riferimento dalla letteratura (chessprogramming wiki, suite TalkChess).
+SUITE = [
+    ("Iniziale", "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+     [20, 400, 8902, 197281]),
+    ("Kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+     [48, 2039, 97862]),
+    ("Posizione 3", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+     [14, 191, 2812, 43238, 674624]),
+    ("Posizione 4", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+     [6, 264, 9467]),
+    ("Posizione 5", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+     [44, 1486, 62379]),
+    ("Posizione 6", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+     [46, 2079, 89890]),
+    # Casi limite: en-passant illegali, arrocchi, promozioni
+    ("EP illegale (scacco)", "3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1",
+     [18, 92, 1670, 10138, 185429, 1134888]),
+    ("EP con inchiodatura", "8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1",
+     [15, 126, 1928, 13931, 206379, 1440467]),
+    ("Alfiere e pedone", "8/8/4k3/8/2p5/8/B2P2K1/8 w - - 0 1",
+     [13, 102, 1266, 10276, 135655, 1015133]),
+    ("Arrocco corto con scacco", "5k2/8/8/8/8/8/8/4K2R w K - 0 1",
+     [15, 66, 1198, 6399, 120330, 661072]),
+    ("Arrocco lungo con scacco", "3k4/8/8/8/8/8/8/R3K3 w Q - 0 1",
+     [16, 71, 1286, 7418, 141077, 803711]),
+    ("Arrocchi e alfieri", "r3k2r/1b4bq/8/8/8/8/7B/R3K2R w KQkq - 0 1",
+     [26, 1141, 27826, 1274206]),
+    ("Arrocchi e donne", "r3k2r/8/3Q4/8/8/5q2/8/R3K2R b KQkq - 0 1",
+     [44, 1494, 50509, 1720476]),
+    ("Promozione fuori dallo scacco", "2K2r2/4P3/8/8/8/8/8/3k4 w - - 0 1",
+     [11, 133, 1442, 19174, 266199, 3821001]),
+    ("Sottopromozione", "8/8/1P2K3/8/2n5/1q6/8/5k2 b - - 0 1",
+     [29, 165, 5160, 31961, 1004658]),
+    ("Promozione con scacco", "4k3/1P6/8/8/8/8/K7/8 w - - 0 1",
+     [9, 40, 472, 2661, 38983, 217342]),
+    ("Promozione e stallo", "8/P1k5/K7/8/8/8/8/8 w - - 0 1",
+     [6, 27, 273, 1329, 18135, 92683]),
+    ("Re e pedone", "K1k5/8/P7/8/8/8/8/8 w - - 0 1",
+     [2, 6, 13, 63, 382, 2217]),
+    ("Donna e cavallo", "8/8/2k5/5q2/5n2/8/5K2/8 b - - 0 1",
+     [37, 183, 6559, 23527]),
+]
+
+# ---------- Perft -----------------------------------------------------------
+def perft(pos, profondita):
+    """Numero di foglie a profondita' fissa (conteggio 'bulk' all'ultimo livello)."""
+    if profondita == 0:
+        return 1
+    mosse = core.genera_mosse_legali(pos)
+    if profondita == 1:
+        return len(mosse)
+    nodi = 0
+    for m in mosse:
+        core.make_move(pos, m)
+        nodi += perft(pos, profondita - 1)
+        core.unmake_move(pos)
+    return nodi
+
+
+def divide(pos, profondita):
+    """Nodi per ogni mossa della radice: [(mossa 'e2e4', nodi), ...]."""
+    risultato = []
+    for m in core.genera_mosse_legali(pos):
+        core.make_move(pos, m)
+        risultato.append((core.mossa_uci(m), perft(pos, profondita - 1)))
+        core.unmake_move(pos)
+    return risultato
+
+# ---------- Suite ----------------------------------------------------------
+def esegui_suite(profondita_max=4, stampa=print):
+    """Esegue la suite. Ritorna il numero di conteggi errati."""
+    errori = 0
+    nodi_tot, tempo_tot = 0, 0.0
+    for nome, fen, attesi in SUITE:
+        prof = min(profondita_max, len(attesi))
+        pos = core.da_fen(fen)
+        t0 = time.perf_counter()
+        nodi = perft(pos, prof)
+        dt = time.perf_counter() - t0
+        nodi_tot += nodi
+        tempo_tot += dt
+        esito = "ok" if nodi == attesi[prof - 1] else f"ERRATO (attesi {attesi[prof - 1]})"
+        if nodi != attesi[prof - 1]:
+            errori += 1
+        nps = nodi / dt if dt > 0 else 0
+        stampa(f"  {nome:<30} d={prof} nodi={nodi:<9} {dt:7.2f}s {nps:10.0f} nodi/s  {esito}")
+    nps = nodi_tot / tempo_tot if tempo_tot > 0 else 0
+    stampa(f"  Totale: {nodi_tot} nodi in {tempo_tot:.2f}s -> {nps:.0f} nodi/s")
+    return errori
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perft e benchmark del generatore di mosse")
+    parser.add_argument("--profondita", type=int, default=4, help="profondita' massima della suite")
+    parser.add_argument("--divide", type=int, metavar="N", help="divide a profondita' N sulla --fen")
+    parser.add_argument("--fen", default=SUITE[0][1])
+    args = parser.parse_args(argv)
+
+    if args.divide:
+        t0 = time.perf_counter()
+        righe = divide(core.da_fen(args.fen), args.divide)
+        dt = time.perf_counter() - t0
+        for mossa, nodi in sorted(righe):
+            print(f"  {mossa}: {nodi}")
+        print(f"  Mosse: {len(righe)}  Nodi: {sum(n for _, n in righe)}  ({dt:.2f}s)")
+        return 0
+
+    errori = esegui_suite(args.profondita)
+    if errori:
+        print(f"ATTENZIONE: {errori} conteggi non corrispondono")
+    return 1 if errori else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
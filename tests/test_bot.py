@@ -0,0 +1,85 @@
+# Test del bot: pondering e ricerca in background.
+# Uso: python -m pytest tests   (oppure python -m unittest discover tests)
+import time
+import unittest
+
+import bot
+import chess_core as core
+
+# Ricerca normale breve; bot_depth alto perché il ponder non finisca da solo
+CONFIG = {"bot_depth": 30, "bot_movetime_ms": 100, "tt_mb": 1, "bot_workers": 1,
+          "bot_libro": "", "bot_finali": ""}
+
+
+def _mossa(pos, uci):
+    return next(m for m in core.genera_mosse_legali(pos) if core.mossa_uci(m) == uci)
+
+
+class TestPonder(unittest.TestCase):
+
+    def setUp(self):
+        # Il bot ha il nero: il giocatore è al tratto, risposta prevista e2e4
+        self.pos = core.Position()
+        self.prevista = _mossa(self.pos, "e2e4")
+        self.dopo = self.pos.copia()
+        core.make_move(self.dopo, self.prevista)
+        self.ponder = bot.Ponder(self.pos, "b", [0, self.prevista], CONFIG)
+        self.addCleanup(self.ponder.attendi)
+        self.addCleanup(self.ponder.annulla)
+
+    def _aspetta_profondita(self, profondita=1):
+        r = self.ponder.ricerca
+        while r.profondita < profondita and not r.pronta():
+            time.sleep(0.001)
+
+    def _risposta(self):
+        ricerca = self.ponder.dopo_mossa(self.dopo, self.prevista, CONFIG)
+        self.addCleanup(ricerca.attendi)
+        self.addCleanup(ricerca.annulla)
+        return ricerca
+
+    def test_ponder_annullato_presto_non_e_un_hit(self):
+        self._aspetta_profondita()
+        self.ponder.annulla()
+        self.ponder.ricerca.attendi()
+        durata = self.ponder.ricerca.secondi
+        # Il giocatore pensa ancora: il tempo dopo l'annullamento non conta
+        time.sleep(3 * CONFIG["bot_movetime_ms"] / 1000)
+        self.assertEqual(self.ponder.ricerca.secondi, durata)
+        ricerca = self._risposta()
+        self.assertIsNot(ricerca, self.ponder.ricerca)
+        ricerca.attendi()
+        self.assertIsNotNone(ricerca.esito())
+
+    def test_ponder_lungo_quanto_una_ricerca_e_un_hit(self):
+        self._aspetta_profondita()
+        time.sleep(2 * CONFIG["bot_movetime_ms"] / 1000)
+        ricerca = self._risposta()
+        self.assertIs(ricerca, self.ponder.ricerca)
+        self.assertGreaterEqual(ricerca.secondi * 1000, CONFIG["bot_movetime_ms"])
+
+    def test_mossa_non_prevista_cerca_da_capo(self):
+        self._aspetta_profondita()
+        altro = self.pos.copia()
+        core.make_move(altro, _mossa(altro, "d2d4"))
+        ricerca = self.ponder.dopo_mossa(altro, core.ultima_mossa(altro), CONFIG)
+        self.addCleanup(ricerca.attendi)
+        self.addCleanup(ricerca.annulla)
+        self.assertIsNot(ricerca, self.ponder.ricerca)
+
+
+class TestCercaMossa(unittest.TestCase):
+
+    def test_mossa_forzata_senza_ricerca(self):
+        pos = core.da_fen("k7/8/1K6/8/8/8/8/2R5 b - - 0 1")
+        config = dict(CONFIG, bot_movetime_ms=5000)
+        inizio = time.perf_counter()
+        mossa, _, pv = bot.cerca_mossa(pos, "b", config, in_corso=self)
+        self.assertLess(time.perf_counter() - inizio, 0.5)
+        self.assertEqual(core.mossa_uci(mossa), "a8b8")
+        self.assertEqual(pv, [mossa])
+        self.assertFalse(hasattr(self, "ricerca"))      # nessuna Ricerca avviata
+
+
+if __name__ == "__main__":
+    unittest.main()
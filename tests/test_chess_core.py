@@ -0,0 +1,162 @@
+# Test di chess_core: salvataggio e ripristino dello stato per il replay.
+# Uso: python -m pytest tests   (oppure python -m unittest discover tests)
+import random
+import unittest
+
+import chess_core as core
+
+MOSSE = ["e2e4", "e7e5", "g1f3", "b8c6", "f1c4", "g8f6", "e1g1", "f8c5", "d2d4", "e5d4"]
+
+
+def _mossa(pos, uci):
+    """Mossa legale della posizione con la notazione UCI data."""
+    return next(m for m in core.genera_mosse_legali(pos) if core.mossa_uci(m) == uci)
+
+
+class TestRipristinoStato(unittest.TestCase):
+
+    def setUp(self):
+        self.pos = core.Position()
+        self.iniziale = core.salva_stato_completo(self.pos)
+        self.stati = []
+        for uci in MOSSE:
+            core.make_move(self.pos, _mossa(self.pos, uci))
+            self.stati.append(core.salva_stato_completo(self.pos))
+
+    def assertStato(self, pos, stato):
+        self.assertEqual(core.a_fen(pos), stato['fen'])
+        self.assertEqual(pos.hash, stato['hash'])
+        self.assertEqual(pos.ply, stato['storico_len'])
+
+    def test_ripristino_all_indietro(self):
+        core.ripristina_stato_completo(self.pos, self.stati[3])
+        self.assertStato(self.pos, self.stati[3])
+        self.assertEqual([core.mossa_uci(m) for m in core.ottieni_storico_mosse(self.pos)],
+                         MOSSE[:4])
+
+    def test_ripristino_in_avanti(self):
+        # Replay: si torna all'inizio e poi si salta alla fine
+        core.ripristina_stato_completo(self.pos, self.iniziale)
+        self.assertStato(self.pos, self.iniziale)
+        core.ripristina_stato_completo(self.pos, self.stati[-1])
+        self.assertStato(self.pos, self.stati[-1])
+        self.assertEqual([core.mossa_uci(m) for m in core.ottieni_storico_mosse(self.pos)],
+                         MOSSE)
+        # La pila di undo corrisponde alla board: si torna indietro mossa per mossa
+        for stato in reversed(self.stati[:-1]):
+            core.unmake_move(self.pos)
+            self.assertStato(self.pos, stato)
+        core.unmake_move(self.pos)
+        self.assertStato(self.pos, self.iniziale)
+        self.assertEqual(self.pos.valutazione, core.calcola_valutazione(self.pos))
+
+    def test_mosse_dopo_il_ripristino(self):
+        core.ripristina_stato_completo(self.pos, self.iniziale)
+        core.ripristina_stato_completo(self.pos, self.stati[5])
+        core.make_move(self.pos, _mossa(self.pos, MOSSE[6]))
+        self.assertStato(self.pos, self.stati[6])
+        core.unmake_move(self.pos)
+        self.assertStato(self.pos, self.stati[5])
+
+
+class TestFen(unittest.TestCase):
+
+    FEN = [
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3",
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 b - - 7 10",
+    ]
+
+    def test_andata_e_ritorno(self):
+        for fen in self.FEN:
+            pos = core.da_fen(fen)
+            self.assertEqual(core.a_fen(pos), fen)
+            self.assertEqual(pos.hash, core.calcola_hash(pos))
+            self.assertEqual(pos.valutazione, core.calcola_valutazione(pos))
+
+    def test_posizione_iniziale(self):
+        pos = core.Position()
+        self.assertEqual(core.a_fen(pos), self.FEN[0])
+        self.assertEqual(core.da_fen(self.FEN[0]).hash, pos.hash)
+
+    def test_partita_giocata(self):
+        pos = core.Position()
+        for uci in MOSSE:
+            core.make_move(pos, _mossa(pos, uci))
+            copia = core.da_fen(core.a_fen(pos))
+            self.assertEqual(copia.board, pos.board)
+            self.assertEqual(copia.hash, pos.hash)
+
+    def test_orologi_opzionali(self):
+        pos = core.da_fen("8/8/4k3/8/8/8/4K3/8 b - -")
+        self.assertEqual((pos.mezze_mosse, pos.numero_mossa), (0, 1))
+
+    def test_fen_non_valide(self):
+        for fen in ("",
+                    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq",
+                    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1",
+                    "rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+                    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNX w KQkq - 0 1",
+                    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1",
+                    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e4 0 1",
+                    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - a 1"):
+            with self.assertRaises(ValueError, msg=fen):
+                core.da_fen(fen)
+
+    def test_stato_da_fen(self):
+        pos = core.Position()
+        core.ripristina_stato_completo(pos, core.stato_da_fen(self.FEN[1]))
+        self.assertEqual(core.a_fen(pos), self.FEN[1])
+        self.assertEqual(pos.ply, 0)
+
+
+class TestChiaveIncrementale(unittest.TestCase):
+    """Position.hash, hash_pedoni, valutazione e pezzi tenuti da make/unmake."""
+
+    def assertCoerente(self, pos):
+        self.assertEqual(pos.hash, core.calcola_hash(pos))
+        self.assertEqual(pos.hash_pedoni, core.calcola_hash_pedoni(pos))
+        self.assertEqual(pos.valutazione, core.calcola_valutazione(pos))
+        self.assertEqual(pos.pezzi, core.conta_pezzi(pos.board))
+
+    def test_partite_casuali(self):
+        rng = random.Random(7)
+        for _ in range(40):
+            pos = core.Position()
+            iniziale = core.a_fen(pos), pos.hash, pos.valutazione
+            for _ in range(80):
+                mosse = core.genera_mosse_legali(pos)
+                if not mosse:
+                    break
+                core.make_move(pos, rng.choice(mosse))
+                self.assertCoerente(pos)
+            while pos.ply:
+                core.unmake_move(pos)
+                self.assertCoerente(pos)
+            self.assertEqual((core.a_fen(pos), pos.hash, pos.valutazione), iniziale)
+
+    def test_mossa_nulla(self):
+        pos = core.da_fen("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3")
+        prima = pos.hash
+        core.make_null_move(pos)
+        self.assertCoerente(pos)
+        core.unmake_null_move(pos)
+        self.assertEqual(pos.hash, prima)
+
+    def test_en_passant_solo_se_catturabile(self):
+        # Dopo 1.e4 nessun pedone nero puo' prendere en-passant: stessa chiave
+        pos = core.Position()
+        core.make_move(pos, _mossa(pos, "e2e4"))
+        for ep in ("e3", "-"):
+            fen = f"rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq {ep} 0 1"
+            self.assertEqual(core.da_fen(fen).hash, pos.hash)
+        # Con un pedone accanto la cattura e' possibile: la colonna conta
+        con = core.da_fen("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3")
+        senza = core.da_fen("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq - 0 3")
+        self.assertNotEqual(con.hash, senza.hash)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+# Test delle tabelle dei finali (finali.py): generazione, valori DTM e sonde.
+# Uso: python -m pytest tests   (oppure python -m unittest discover tests)
+import os
+import random
+import tempfile
+import unittest
+
+import chess_core as core
+import finali
+
+# Matto piu' lungo (semimosse) noto per ogni finale a 3 pezzi
+MATTO_PIU_LUNGO = {"KQK": 20, "KRK": 32, "KPK": 56}
+
+
+class TestTabelleFinali(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cartella = tempfile.TemporaryDirectory()
+        for firma in finali.FINALI_3:
+            finali.genera(firma, cls.cartella.name, stampa=lambda *_: None)
+        cls.tabelle = finali.TabelleFinali(cls.cartella.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tabelle.chiudi()
+        cls.cartella.cleanup()
+
+    def sonda(self, fen):
+        return self.tabelle.sonda(core.da_fen(fen))
+
+    def test_file_generati(self):
+        self.assertEqual(self.tabelle.max_pezzi, 3)
+        self.assertIsNone(finali.genera("KNK", self.cartella.name, stampa=lambda *_: None))
+        self.assertFalse(os.path.exists(os.path.join(self.cartella.name, "KNK.dtm")))
+
+    def test_matto_piu_lungo(self):
+        for firma, atteso in MATTO_PIU_LUNGO.items():
+            with open(os.path.join(self.cartella.name, firma + ".dtm"), "rb") as f:
+                dati = f.read()
+            n = max(b - 1 for b in dati if b not in (finali.PATTA, finali.INDECISO, finali.ILLEGALE))
+            self.assertEqual(n, atteso, firma)
+
+    def test_valori_noti(self):
+        for fen, atteso in (
+                ("k7/8/1K6/8/8/8/8/6Q1 w - - 0 1", (1, 1)),      # Qg8#
+                ("k7/1Q6/1K6/8/8/8/8/8 b - - 0 1", (-1, 0)),     # matto
+                ("k7/8/1KQ5/8/8/8/8/8 b - - 0 1", (-1, 2)),
+                ("4k3/4P3/4K3/8/8/8/8/8 b - - 0 1", (0, 0)),     # stallo
+                ("4k3/8/4K3/4P3/8/8/8/8 b - - 0 1", (-1, 24)),
+                ("8/8/8/8/8/4k3/4P3/4K3 w - - 0 1", (0, 0)),
+                ("8/8/8/4k3/8/8/8/R3K3 w - - 0 1", (1, 27))):
+            self.assertEqual(self.sonda(fen), atteso, fen)
+
+    def test_colori_invertiti(self):
+        # Stessa posizione con i colori scambiati e la scacchiera capovolta
+        for fen, invertita in (
+                ("k7/8/1K6/8/8/8/8/6Q1 w - - 0 1", "6q1/8/8/8/8/1k6/8/K7 b - - 0 1"),
+                ("4k3/8/4K3/4P3/8/8/8/8 b - - 0 1", "8/8/8/8/4p3/4k3/8/4K3 w - - 0 1"),
+                ("8/8/8/4k3/8/8/8/R3K3 w - - 0 1", "r3k3/8/8/8/4K3/8/8/8 b - - 0 1")):
+            self.assertEqual(self.sonda(invertita), self.sonda(fen), invertita)
+
+    def test_finale_sempre_patto(self):
+        self.assertEqual(self.sonda("8/8/8/8/8/2k5/8/2K1B3 w - - 0 1"), (0, 0))
+        self.assertEqual(self.sonda("8/8/8/8/8/2k5/8/2K1n3 b - - 0 1"), (0, 0))
+
+    def test_non_coperte(self):
+        self.assertIsNone(self.sonda("4k3/8/8/8/8/8/8/R3K3 w Q - 0 1"))       # arrocco
+        self.assertIsNone(self.sonda("8/8/8/8/8/2k5/8/Q1K1B3 w - - 0 1"))     # 4 pezzi
+        self.assertIsNotNone(self.sonda("8/8/8/8/4Pk2/8/8/4K3 b - e3 0 1"))  # ep non catturabile
+
+    def test_coerenza_con_i_figli(self):
+        # Il valore di ogni posizione e' quello della mossa migliore piu' una semimossa
+        rng = random.Random(7)
+        provate = 0
+        while provate < 300:
+            firma = finali.FINALI_3[provate % 3]
+            pos = _posizione_casuale(firma, rng)
+            if pos is None:
+                continue
+            provate += 1
+            v = self.tabelle.sonda(pos)
+            migliore = self.tabelle.mossa(pos)
+            if migliore is None:
+                self.assertEqual(v, (-1, 0) if core.re_sotto_scacco(pos) else (0, 0))
+            else:
+                self.assertEqual(v, migliore[1:], core.a_fen(pos))
+
+    def test_gioca_il_matto(self):
+        # La mossa perfetta per entrambi i lati matta in esattamente n semimosse
+        for fen in ("8/8/8/4k3/8/8/8/R3K3 w - - 0 1", "8/8/8/8/8/8/3KP3/6k1 w - - 0 1"):
+            pos = core.da_fen(fen)
+            _, n = self.tabelle.sonda(pos)
+            for _ in range(n):
+                core.make_move(pos, self.tabelle.mossa(pos)[0])
+            self.assertEqual(core.genera_mosse_legali(pos), [], fen)
+            self.assertTrue(core.re_sotto_scacco(pos), fen)
+
+
+def _posizione_casuale(firma, rng):
+    """Posizione legale a caso del finale, con il bianco come lato forte; None se illegale."""
+    caselle = rng.sample(range(64), 3)
+    pezzo = firma[1]
+    if pezzo == "P" and not 8 <= caselle[1] < 56:
+        return None
+    board = [[""] * 8 for _ in range(8)]
+    for sq, p in zip(caselle, ("wK", "w" + pezzo, "bK")):
+        board[sq >> 3][sq & 7] = p
+    righe = []
+    for riga in board:
+        fen, vuote = "", 0
+        for p in riga:
+            if p:
+                fen += (str(vuote) if vuote else "") + (p[1] if p[0] == "w" else p[1].lower())
+                vuote = 0
+            else:
+                vuote += 1
+        righe.append(fen + (str(vuote) if vuote else ""))
+    turno = rng.choice("wb")
+    pos = core.da_fen("/".join(righe) + f" {turno} - - 0 1")
+    if core.re_sotto_scacco(pos, "b" if turno == "w" else "w"):
+        return None                         # il lato che non muove e' sotto scacco
+    if abs((caselle[0] >> 3) - (caselle[2] >> 3)) <= 1 and abs((caselle[0] & 7) - (caselle[2] & 7)) <= 1:
+        return None                         # re adiacenti
+    return pos
+
+
+if __name__ == "__main__":
+    unittest.main()
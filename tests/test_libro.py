@@ -0,0 +1,132 @@
+# Test del libro d'aperture (libro.py): PGN, SAN, costruzione e sonda.
+# Uso: python -m pytest tests   (oppure python -m unittest discover tests)
+import os
+import random
+import tempfile
+import unittest
+
+import chess_core as core
+import libro
+
+PGN = """[Event "Prova"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 {commento} Nc6 (2... d6 3. d4) 3. Bb5 a6 $1 1-0
+
+[Event "Prova"]
+[Result "1/2-1/2"]
+
+1. e4 e5 2. Nf3 Nf6 ; commento di riga
+3. Nxe5 d6 1/2-1/2
+
+[Event "Prova"]
+[Result "0-1"]
+
+1. d4 d5 2. c4 e6 0-1
+
+[Event "Prova"]
+[Result "1-0"]
+
+1.e4 c5 2.Nf3 d6 1-0
+"""
+
+
+def _uci(mosse):
+    return [core.mossa_uci(m) for m in mosse]
+
+
+class TestPgn(unittest.TestCase):
+
+    def test_leggi_pgn(self):
+        partite = list(libro.leggi_pgn(PGN.splitlines(True)))
+        self.assertEqual([r for r, _ in partite], ["1-0", "1/2-1/2", "0-1", "1-0"])
+        self.assertEqual(partite[0][1], ["e4", "e5", "Nf3", "Nc6", "Bb5", "a6"])
+        self.assertEqual(partite[3][1], ["e4", "c5", "Nf3", "d6"])
+
+    def test_san_a_mossa(self):
+        pos = core.da_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+        for san, uci in (("O-O", "e1g1"), ("O-O-O", "e1c1"), ("Bxa6", "e2a6"),
+                         ("dxe6", "d5e6"), ("Qxf6+", "f3f6"), ("Nxg6", "e5g6")):
+            self.assertEqual(core.mossa_uci(libro.san_a_mossa(pos, san)), uci)
+        pos = core.da_fen("4k3/1P6/8/8/8/8/7K/R6R w - - 0 1")
+        self.assertEqual(core.mossa_uci(libro.san_a_mossa(pos, "b8=N")), "b7b8n")
+        self.assertEqual(core.mossa_uci(libro.san_a_mossa(pos, "b8")), "b7b8q")
+        self.assertEqual(core.mossa_uci(libro.san_a_mossa(pos, "Rad1")), "a1d1")
+        for san in ("Rd1", "Nf3", "e5", "zz"):       # ambigua, illegale, illegale, non valida
+            with self.assertRaises(ValueError, msg=san):
+                libro.san_a_mossa(pos, san)
+
+
+class TestLibro(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cartella = tempfile.TemporaryDirectory()
+        pgn = os.path.join(cls.cartella.name, "prova.pgn")
+        with open(pgn, "w", encoding="utf-8") as f:
+            f.write(PGN)
+        cls.percorso = os.path.join(cls.cartella.name, "libro.bin")
+        cls.record = libro.costruisci([pgn], cls.percorso, ply_max=4, stampa=lambda *_: None)
+        cls.libro = libro.LibroAperture(cls.percorso)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.libro.chiudi()
+        cls.cartella.cleanup()
+
+    def test_record_ordinati(self):
+        self.assertEqual(len(self.libro), self.record)
+        self.assertEqual(os.path.getsize(self.percorso), self.record * libro.DIMENSIONE_RECORD)
+
+    def test_pesi_dalla_posizione_iniziale(self):
+        # e4: 2 + 1 + 2 punti per il bianco; d4: partita persa, peso 0 e scartata
+        self.assertEqual(self.libro.mosse(core.Position()), [(_uci_a_mossa("e2e4"), 5)])
+
+    def test_pesi_per_il_nero(self):
+        pos = core.Position()
+        core.make_move(pos, _uci_a_mossa("e2e4"))
+        voci = self.libro.mosse(pos)
+        self.assertEqual(_uci(m for m, _ in voci), ["e7e5"])   # c5 ha perso: peso 0
+        self.assertEqual(voci[0][1], 1)
+
+    def test_en_passant_non_catturabile(self):
+        # Stessa posizione da FEN con e senza casella en-passant: stesse voci
+        for ep in ("e3", "-"):
+            pos = core.da_fen(f"rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq {ep} 0 1")
+            self.assertEqual(_uci(m for m, _ in self.libro.mosse(pos)), ["e7e5"])
+
+    def test_mossa(self):
+        pos = core.Position()
+        for _ in ("e2e4", "e7e5"):
+            core.make_move(pos, self.libro.mossa(pos, casuale=False))
+        self.assertEqual(core.mossa_uci(self.libro.mossa(pos, rng=random.Random(1))), "g1f3")
+        core.make_move(pos, _uci_a_mossa("g1f3", pos))
+        core.make_move(pos, _uci_a_mossa("b8c6", pos))
+        self.assertEqual(self.libro.mossa(pos), 0)          # oltre ply_max
+
+    def test_fuori_dal_libro(self):
+        pos = core.da_fen("8/8/4k3/8/8/8/4K3/8 w - - 0 1")
+        self.assertEqual(self.libro.voci(pos.hash), [])
+        self.assertEqual(self.libro.mossa(pos), 0)
+
+    def test_file_non_valido(self):
+        percorso = os.path.join(self.cartella.name, "rotto.bin")
+        with open(percorso, "wb") as f:
+            f.write(b"\0" * (libro.DIMENSIONE_RECORD + 1))
+        with self.assertRaises(ValueError):
+            libro.LibroAperture(percorso)
+
+    def test_libro_vuoto(self):
+        percorso = os.path.join(self.cartella.name, "vuoto.bin")
+        open(percorso, "wb").close()
+        with libro.LibroAperture(percorso) as vuoto:
+            self.assertEqual(vuoto.mossa(core.Position()), 0)
+
+
+def _uci_a_mossa(uci, pos=None):
+    pos = pos or core.Position()
+    return next(m for m in core.genera_mosse_legali(pos) if core.mossa_uci(m) == uci)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+# Test della tabella delle trasposizioni (transposition.py).
+# Uso: python -m pytest tests   (oppure python -m unittest discover tests)
+import multiprocessing
+import random
+import unittest
+
+from transposition import TabellaTrasposizione, ESATTO, INFERIORE, SUPERIORE
+
+
+class TestTabellaTrasposizione(unittest.TestCase):
+
+    def setUp(self):
+        self.tt = TabellaTrasposizione(1)
+        self.chiave = random.Random(5).getrandbits(64)
+
+    def test_salva_e_sonda(self):
+        self.assertIsNone(self.tt.sonda(self.chiave))
+        self.tt.salva(self.chiave, 6, -123, INFERIORE, 0x1234)
+        self.assertEqual(self.tt.sonda(self.chiave), (-123, 6, INFERIORE, 0x1234))
+        self.assertEqual(self.tt.mossa(self.chiave), 0x1234)
+
+    def test_stesso_indice_chiave_diversa(self):
+        self.tt.salva(self.chiave, 4, 50, ESATTO, 7)
+        # Stessi bit bassi (stesso bucket), chiave diversa: nessuna voce
+        self.assertIsNone(self.tt.sonda(self.chiave ^ (1 << 63)))
+
+    def test_voce_corrotta_non_valida(self):
+        # Una scrittura a metà (dati cambiati senza la chiave) fallisce la verifica XOR
+        self.tt.salva(self.chiave, 4, 50, ESATTO, 7)
+        i = (self.chiave & self.tt.maschera) * 4
+        self.tt.dati[i+1] ^= 1 << 40
+        self.assertIsNone(self.tt.sonda(self.chiave))
+
+    def test_fail_low_tiene_la_mossa(self):
+        self.tt.salva(self.chiave, 3, 10, ESATTO, 99)
+        self.tt.salva(self.chiave, 5, -20, SUPERIORE, 0)
+        self.assertEqual(self.tt.sonda(self.chiave), (-20, 5, SUPERIORE, 99))
+
+    def test_slot_profondita_e_sempre(self):
+        # Nel bucket la ricerca più profonda resta, quella meno profonda va nello slot "sempre"
+        altra = self.chiave ^ (1 << 62)
+        self.tt.salva(self.chiave, 8, 1, ESATTO, 1)
+        self.tt.salva(altra, 2, 2, ESATTO, 2)
+        self.assertEqual(self.tt.sonda(self.chiave)[1], 8)
+        self.assertEqual(self.tt.sonda(altra)[1], 2)
+
+    def test_punteggi_estremi(self):
+        for punteggio in (-1000000, 0, 1000000):
+            self.tt.salva(self.chiave, 1, punteggio, ESATTO, 0)
+            self.assertEqual(self.tt.sonda(self.chiave)[0], punteggio)
+
+    def test_pulisci(self):
+        self.tt.salva(self.chiave, 4, 50, ESATTO, 7)
+        self.tt.pulisci()
+        self.assertIsNone(self.tt.sonda(self.chiave))
+
+
+def _scrivi_nel_figlio(nome, chiave):
+    """Eseguita in un altro processo: si collega alla tabella e scrive una voce."""
+    tt = TabellaTrasposizione.collega(nome, 1)
+    try:
+        vista = tt.sonda(chiave)
+        tt.salva(chiave ^ 1, 9, 77, INFERIORE, 42)
+    finally:
+        tt.chiudi()
+    return vista
+
+
+class TestTabellaCondivisa(unittest.TestCase):
+
+    def setUp(self):
+        self.tt = TabellaTrasposizione.condivisa(1)
+        self.addCleanup(self.tt.chiudi)
+        self.chiave = random.Random(11).getrandbits(64)
+
+    def test_collega_nello_stesso_processo(self):
+        altra = TabellaTrasposizione.collega(self.tt.nome, 1)
+        self.addCleanup(altra.chiudi)
+        self.tt.salva(self.chiave, 5, 33, ESATTO, 17)
+        self.assertEqual(altra.sonda(self.chiave), (33, 5, ESATTO, 17))
+
+    def test_collega_da_un_altro_processo(self):
+        self.tt.salva(self.chiave, 5, 33, ESATTO, 17)
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            vista = pool.apply(_scrivi_nel_figlio, (self.tt.nome, self.chiave))
+        self.assertEqual(vista, (33, 5, ESATTO, 17))
+        self.assertEqual(self.tt.sonda(self.chiave ^ 1), (77, 9, INFERIORE, 42))
+
+    def test_chiudi_rilascia_il_blocco(self):
+        nome = self.tt.nome
+        self.tt.chiudi()
+        self.assertIsNone(self.tt.nome)
+        with self.assertRaises(FileNotFoundError):
+            TabellaTrasposizione.collega(nome, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
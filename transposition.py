@@ -0,0 +1,163 @@
+# transposition.py
+# ============================================================
+#  Tabella delle trasposizioni a dimensione fissa per il bot.
+#  Indicizzata dalla chiave Zobrist di chess_core (Position.hash).
+#  Ogni bucket ha due slot: il primo conserva la ricerca piu'
+#  profonda, il secondo viene sempre sovrascritto.
+#  La tabella puo' stare in multiprocessing.shared_memory ed essere
+#  usata da piu' processi insieme senza lock: ogni slot salva
+#  chiave XOR dati, quindi una scrittura a meta' non viene validata.
+#  In fondo, la piccola cache dei punteggi della struttura pedonale.
+# ============================================================
+from array import array
+from multiprocessing import shared_memory
+
+# Tipo di punteggio salvato
+ESATTO, INFERIORE, SUPERIORE = 0, 1, 2      # valore esatto / fail-high / fail-low
+
+# Slot = chiave XOR dati (64 bit) + dati (64 bit):
+#   mossa (16 bit) | profondita' (8) | limite (2) | eta' (6) | punteggio+OFFSET (32)
+_PAROLE_BUCKET = 4                          # 2 slot x (chiave, dati)
+_BYTE_BUCKET = 8 * _PAROLE_BUCKET
+_OFFSET = 1 << 31
+
+
+def _bucket(mb):
+    n = max(1, int(mb * 1024 * 1024) // _BYTE_BUCKET)
+    return 1 << (n.bit_length() - 1)       # potenza di 2: indice = chiave & maschera
+
+
+class TabellaTrasposizione:
+    """
+    Tabella a memoria limitata: la dimensione in MB e' fissata alla creazione.
+    Privata del processo (array) oppure in memoria condivisa: vedi
+    condivisa() e collega().
+    """
+    __slots__ = ("dati", "maschera", "eta", "mb", "memoria", "proprietaria")
+
+    def __init__(self, mb=16, memoria=None, proprietaria=False):
+        n = _bucket(mb)
+        if memoria is None:
+            self.dati = array("Q", bytes(n * _BYTE_BUCKET))
+        else:
+            self.dati = memoria.buf[:n * _BYTE_BUCKET].cast("Q")
+        self.memoria = memoria
+        self.proprietaria = proprietaria
+        self.maschera = n - 1
+        self.eta = 0
+        self.mb = mb
+
+    @classmethod
+    def condivisa(cls, mb=16):
+        """Nuova tabella in memoria condivisa (azzerata); gli altri processi usano collega(nome)."""
+        memoria = shared_memory.SharedMemory(create=True, size=_bucket(mb) * _BYTE_BUCKET)
+        tabella = cls(mb, memoria, proprietaria=True)
+        tabella.pulisci()
+        return tabella
+
+    @classmethod
+    def collega(cls, nome, mb=16):
+        """Tabella creata da un altro processo con condivisa()."""
+        return cls(mb, shared_memory.SharedMemory(name=nome))
+
+    @property
+    def nome(self):
+        """Nome del blocco di memoria condivisa (None se privata)."""
+        return self.memoria.name if self.memoria is not None else None
+
+    def chiudi(self):
+        """Rilascia la memoria condivisa (e la elimina se creata da questo processo)."""
+        if self.memoria is None:
+            return
+        self.dati.release()
+        self.memoria.close()
+        if self.proprietaria:
+            self.memoria.unlink()
+        self.memoria = None
+
+    def pulisci(self):
+        """Svuota la tabella (nuova partita), sul posto: vale anche se condivisa."""
+        byte = memoryview(self.dati).cast("B")
+        byte[:] = bytes(len(byte))
+        self.eta = 0
+
+    def nuova_ricerca(self):
+        """Le voci delle ricerche precedenti diventano sostituibili per prime."""
+        self.eta = (self.eta + 1) & 63
+
+    def sonda(self, chiave):
+        """(punteggio, profondita', limite, mossa) salvati per la chiave, oppure None."""
+        i = (chiave & self.maschera) * _PAROLE_BUCKET
+        d = self.dati
+        v = d[i+1]
+        if d[i] ^ v != chiave:
+            v = d[i+3]
+            if d[i+2] ^ v != chiave:
+                return None
+        return (v >> 32) - _OFFSET, v >> 16 & 255, v >> 24 & 3, v & 0xFFFF
+
+    def mossa(self, chiave):
+        """Sola mossa migliore salvata (0 se assente): per l'ordinamento."""
+        voce = self.sonda(chiave)
+        return voce[3] if voce else 0
+
+    def salva(self, chiave, profondita, punteggio, limite, mossa):
+        i = (chiave & self.maschera) * _PAROLE_BUCKET
+        d = self.dati
+        v = d[i+1]
+        stessa = d[i] ^ v == chiave
+        # Slot "profondita'": stessa posizione, ricerca non meno profonda
+        # oppure voce di una ricerca passata; altrimenti slot "sempre"
+        if not (stessa or profondita >= (v >> 16 & 255)
+                or (v >> 26 & 63) != self.eta):
+            i += 2
+            v = d[i+1]
+            stessa = d[i] ^ v == chiave
+        if not mossa and stessa:
+            mossa = v & 0xFFFF              # fail-low senza mossa: tiene la vecchia
+        v = (mossa | profondita << 16 | limite << 24 | self.eta << 26
+             | (punteggio + _OFFSET) << 32)
+        d[i] = chiave ^ v
+        d[i+1] = v
+
+    def riempimento(self, campione=1000):
+        """Permille di slot occupati da voci della ricerca corrente (stima)."""
+        d = self.dati
+        n = min(campione, self.maschera + 1) * _PAROLE_BUCKET
+        usati = sum(1 for i in range(0, n, 2) if d[i+1] and (d[i+1] >> 26 & 63) == self.eta)
+        return usati * 2000 // n
+
+
+# ---------- Cache della struttura pedonale ---------------------------------
+class TabellaPedoni:
+    """
+    Cache a mappatura diretta dei punteggi della struttura pedonale,
+    indicizzata dalla chiave dei soli pedoni (Position.hash_pedoni):
+    una voce per indice, la nuova sostituisce sempre la vecchia. I
+    pedoni cambiano in poche mosse, quindi quasi ogni sonda va a segno.
+    Voce = chiave XOR dati + dati, come nella tabella delle trasposizioni.
+    """
+    __slots__ = ("dati", "maschera", "trovate", "mancate")
+
+    def __init__(self, voci=1 << 14):
+        n = 1 << (max(1, voci).bit_length() - 1)
+        self.dati = array("Q", bytes(16 * n))
+        self.maschera = n - 1
+        self.trovate = self.mancate = 0     # statistiche delle sonde
+
+    def sonda(self, chiave):
+        """Punteggio salvato per la chiave, oppure None."""
+        i = (chiave & self.maschera) * 2
+        d = self.dati
+        v = d[i+1]
+        if v and d[i] ^ v == chiave:        # v == 0: voce vuota (la chiave 0 e' lecita)
+            self.trovate += 1
+            return v - _OFFSET
+        self.mancate += 1
+        return None
+
+    def salva(self, chiave, punteggio):
+        i = (chiave & self.maschera) * 2
+        v = punteggio + _OFFSET
+        self.dati[i] = chiave ^ v
+        self.dati[i+1] = v
@@ -0,0 +1,105 @@
+# valutazione.py
+# ============================================================
+#  Tabelle della valutazione statica: materiale + tabelle
+#  posizionali, appiattite per pezzo e casella. Le importano
+#  chess_core (valutazione incrementale in make/unmake), il bot
+#  e valutazione_batch.
+# ============================================================
+
+# Valori materiali standard
+VALORI_PEZZI = {
+    "P": 100, "N": 320, "B": 330, "R": 500, "Q": 900, "K": 20000
+}
+
+# Tabelle posizionali per pedoni (bonus per posizioni avanzate/centrali)
+TABELLA_PEDONI_W = [
+    [0,  0,  0,  0,  0,  0,  0,  0],
+    [50, 50, 50, 50, 50, 50, 50, 50],
+    [10, 10, 20, 30, 30, 20, 10, 10],
+    [5,  5, 10, 25, 25, 10,  5,  5],
+    [0,  0,  0, 20, 20,  0,  0,  0],
+    [5, -5,-10,  0,  0,-10, -5,  5],
+    [5, 10, 10,-20,-20, 10, 10,  5],
+    [0,  0,  0,  0,  0,  0,  0,  0]
+]
+
+# Tabelle posizionali per cavalli (bonus per centro)
+TABELLA_CAVALLI = [
+    [-50,-40,-30,-30,-30,-30,-40,-50],
+    [-40,-20,  0,  0,  0,  0,-20,-40],
+    [-30,  0, 10, 15, 15, 10,  0,-30],
+    [-30,  5, 15, 20, 20, 15,  5,-30],
+    [-30,  0, 15, 20, 20, 15,  0,-30],
+    [-30,  5, 10, 15, 15, 10,  5,-30],
+    [-40,-20,  0,  5,  5,  0,-20,-40],
+    [-50,-40,-30,-30,-30,-30,-40,-50]
+]
+
+# Tabelle per alfieri (diagonali lunghe)
+TABELLA_ALFIERI = [
+    [-20,-10,-10,-10,-10,-10,-10,-20],
+    [-10,  0,  0,  0,  0,  0,  0,-10],
+    [-10,  0,  5, 10, 10,  5,  0,-10],
+    [-10,  5,  5, 10, 10,  5,  5,-10],
+    [-10,  0, 10, 10, 10, 10,  0,-10],
+    [-10, 10, 10, 10, 10, 10, 10,-10],
+    [-10,  5,  0,  0,  0,  0,  5,-10],
+    [-20,-10,-10,-10,-10,-10,-10,-20]
+]
+
+# Tabelle per torri (colonne aperte)
+TABELLA_TORRI = [
+    [0,  0,  0,  0,  0,  0,  0,  0],
+    [5, 10, 10, 10, 10, 10, 10,  5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [0,  0,  0,  5,  5,  0,  0,  0]
+]
+
+# Tabelle per regina (centro e mobilità)
+TABELLA_REGINA = [
+    [-20,-10,-10, -5, -5,-10,-10,-20],
+    [-10,  0,  0,  0,  0,  0,  0,-10],
+    [-10,  0,  5,  5,  5,  5,  0,-10],
+    [-5,  0,  5,  5,  5,  5,  0, -5],
+    [0,  0,  5,  5,  5,  5,  0, -5],
+    [-10,  5,  5,  5,  5,  5,  0,-10],
+    [-10,  0,  5,  0,  0,  0,  0,-10],
+    [-20,-10,-10, -5, -5,-10,-10,-20]
+]
+
+# Tabelle per re (early game: castello, late game: centro)
+TABELLA_RE_EARLY = [
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-20,-30,-30,-40,-40,-30,-30,-20],
+    [-10,-20,-20,-20,-20,-20,-20,-10],
+    [20, 20,  0,  0,  0,  0, 20, 20],
+    [20, 30, 10,  0,  0, 10, 30, 20]
+]
+
+# Tabelle dal punto di vista del bianco (riga 0 = ottava traversa)
+TABELLE_POSIZIONALI = {
+    "P": TABELLA_PEDONI_W,
+    "N": TABELLA_CAVALLI,
+    "B": TABELLA_ALFIERI,
+    "R": TABELLA_TORRI,
+    "Q": TABELLA_REGINA,
+    "K": TABELLA_RE_EARLY
+}
+
+# Tabelle piatte per pezzo: casella riga*8+col -> materiale + bonus,
+# con il segno del colore (bianco +, nero -). Il nero usa la tabella
+# del bianco specchiata in verticale (casella ^ 56), calcolata qui una
+# volta sola all'import.
+VALORI_CASELLA = {}
+for _tipo, _tabella in TABELLE_POSIZIONALI.items():
+    _piatta = [VALORI_PEZZI[_tipo] + v for riga in _tabella for v in riga]
+    VALORI_CASELLA["w" + _tipo] = _piatta
+    VALORI_CASELLA["b" + _tipo] = [-_piatta[sq ^ 56] for sq in range(64)]
+del _tipo, _tabella, _piatta
@@ -0,0 +1,107 @@
+# valutazione_batch.py
+# ============================================================
+#  Valutazione statica di molte posizioni in un colpo solo.
+#  Le board sono codificate come array int8 (N, 64) con i codici
+#  pezzo di chess_core (0 = vuota) e valutate con un unico gather
+#  sulle tabelle materiale + PST di valutazione.py impilate in (13, 64).
+#  NumPy e' opzionale: senza, si ripiega su Python puro.
+#
+#  Uso:
+#    python valutazione_batch.py posizioni.fen    # una FEN per riga
+# ============================================================
+import sys
+import time
+from itertools import chain
+
+import chess_core as core
+from valutazione import VALORI_CASELLA
+
+try:
+    import numpy as np
+except ImportError:                         # acceleratore opzionale
+    np = None
+
+NUMPY_DISPONIBILE = np is not None
+
+# Codice pezzo <-> stringa della board: la stessa codifica di chess_core
+_PEZZI = core.PEZZI_CODICE
+_CODICI = core.CODICE_PEZZO
+# Traverse FEN -> 64 byte di codici direttamente con str.translate
+_FEN_CODICI = str.maketrans({
+    **{ch: chr(_CODICI[("w" if ch.isupper() else "b") + ch.upper()]) for ch in "PNBRQKpnbrqk"},
+    **{str(n): "\0" * n for n in range(1, 9)},
+    "/": None,
+})
+
+if NUMPY_DISPONIBILE:
+    # Riga = codice pezzo, colonna = casella; riga 0 (vuota) vale 0
+    _TABELLE = np.zeros((len(_PEZZI), 64), dtype=np.int32)
+    for _i, _p in enumerate(_PEZZI[1:], 1):
+        _TABELLE[_i] = VALORI_CASELLA[_p]
+    _CASELLE = np.arange(64)
+    del _i, _p
+
+
+def _codici(posizione):
+    """Position, board 8x8 o FEN -> 64 byte di codici pezzo."""
+    if isinstance(posizione, str):
+        riga = posizione.split(None, 1)[0].translate(_FEN_CODICI).encode("latin-1")
+        if len(riga) != 64 or max(riga) >= len(_PEZZI):
+            raise ValueError(f"FEN non valida: {posizione!r}")
+        return riga
+    board = getattr(posizione, "board", posizione)
+    return bytes(map(_CODICI.__getitem__, chain.from_iterable(board)))
+
+
+def codifica(posizioni):
+    """
+    Posizioni (Position, board o FEN) -> array int8 (N, 64) di codici pezzo.
+    Senza NumPy ritorna una lista di bytes da 64 codici.
+    """
+    righe = [_codici(pos) for pos in posizioni]
+    if not NUMPY_DISPONIBILE:
+        return righe
+    if not righe:
+        return np.zeros((0, 64), dtype=np.int8)
+    return np.frombuffer(b"".join(righe), dtype=np.int8).reshape(len(righe), 64)
+
+
+def valuta_codifiche(codici):
+    """Punteggi (bianco positivo) di un blocco codificato con codifica()."""
+    if not NUMPY_DISPONIBILE:
+        tab = [VALORI_CASELLA.get(p) for p in _PEZZI]
+        return [sum(tab[c][sq] for sq, c in enumerate(riga) if c) for riga in codici]
+    return _TABELLE[codici, _CASELLE].sum(axis=1)
+
+
+def valuta_batch(posizioni):
+    """
+    Valutazione statica materiale + tabelle (bianco positivo, come
+    pos.valutazione; senza la struttura pedonale di bot.valuta_posizione)
+    di una sequenza di posizioni: Position, board 8x8 o FEN.
+    """
+    return valuta_codifiche(codifica(posizioni))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("Uso: python valutazione_batch.py <file con una FEN per riga>")
+        return 2
+    with open(argv[0], encoding="utf-8") as f:
+        fens = [riga.strip() for riga in f if riga.strip()]
+    t0 = time.perf_counter()
+    codici = codifica(fens)
+    t1 = time.perf_counter()
+    punteggi = valuta_codifiche(codici)
+    t2 = time.perf_counter()
+    for fen, v in zip(fens, punteggi):
+        print(f"{int(v):7d}  {fen}")
+    motore = "numpy" if NUMPY_DISPONIBILE else "python"
+    print(f"# {len(fens)} posizioni ({motore}): codifica {t1-t0:.3f}s, valutazione {t2-t1:.3f}s",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())